@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class MyAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'my_app'
+
+    def ready(self):
+        from django.conf import settings
+        from django.db.models.signals import post_delete, post_save
+        from .models import QRLink, qrlink_deleted
+        from .utils.notifications import invalidate_admin_ids
+
+        post_save.connect(invalidate_admin_ids, sender=settings.AUTH_USER_MODEL, dispatch_uid='notify_admin_ids_save')
+        post_delete.connect(invalidate_admin_ids, sender=settings.AUTH_USER_MODEL, dispatch_uid='notify_admin_ids_delete')
+        post_delete.connect(qrlink_deleted, sender=QRLink, dispatch_uid='qrlink_primary_code_delete')
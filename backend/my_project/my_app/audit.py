@@ -3,14 +3,29 @@ Audit logging utilities for document management system.
 Implements audit trail as per project rules and database model.
 """
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, close_old_connections, connection, transaction
 from django.utils import timezone
 from .models import AuditLog, Action, Document, ShareLink, QRLink
+import atexit
 import logging
+import queue
+import threading
+import uuid
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
+# Pending audit rows are written by a background thread so that the request
+# does not wait on the INSERT round-trip to the database.
+_audit_queue = queue.Queue()
+_audit_worker = None
+_audit_worker_lock = threading.Lock()
+
+# Postgres gains nothing from multi-row INSERTs larger than ~1000 rows
+AUDIT_LOG_BATCH_SIZE = 1000
+
 
 def get_client_ip(request):
     """Extract client IP address from request."""
@@ -27,6 +42,171 @@ def get_user_agent(request):
     return request.META.get('HTTP_USER_AGENT', '')
 
 
+def _without_deleted_references(payload):
+    """Copy of payload with every foreign key whose target no longer exists set to None.
+
+    Mirrors on_delete=SET_NULL for rows queued before their target was deleted.
+    """
+    payload = dict(payload)
+    for field_name in ('actor_user', 'document', 'share_link', 'qr_link'):
+        key = f'{field_name}_id'
+        if payload[key] is None:
+            continue
+        model = AuditLog._meta.get_field(field_name).related_model
+        if not model._default_manager.filter(pk=payload[key]).exists():
+            payload[key] = None
+    return payload
+
+
+def _write_audit_entry(payload):
+    """Insert a single audit row from a payload built by log_audit_event."""
+    try:
+        try:
+            with transaction.atomic():
+                AuditLog.objects.create(**payload)
+        except IntegrityError:
+            # A referenced user, document or link was deleted before the row was written
+            AuditLog.objects.create(**_without_deleted_references(payload))
+    except Exception as e:
+        logger.error(f"Failed to create audit log: {e}")
+
+
+# Columns written by the raw INSERT path, in payload key order, with their
+# Postgres types (used to declare the prepared statement's array parameters)
+_AUDIT_LOG_COLUMNS = (
+    ('ts', 'timestamptz'),
+    ('actor_user_id', 'integer'),
+    ('action', 'text'),
+    ('document_id', 'bigint'),
+    ('version_no', 'integer'),
+    ('ip', 'inet'),
+    ('user_agent', 'text'),
+    ('context', 'jsonb'),
+    ('share_link_id', 'uuid'),
+    ('qr_link_id', 'uuid'),
+)
+# Parameter types of the prepared INSERT: the row id followed by every column
+_AUDIT_LOG_PREPARED_TYPES = ('uuid',) + tuple(pg_type for _, pg_type in _AUDIT_LOG_COLUMNS)
+
+# Connection the prepared INSERT was last created on (per writer thread)
+_audit_prepared = threading.local()
+
+
+def _prepare_audit_insert(cursor):
+    """PREPARE the unnest-based audit INSERT once per database connection.
+
+    The statement takes one array per column, so its shape does not depend on
+    the batch size and Postgres parses and plans it only once per connection.
+    """
+    raw_connection = cursor.connection
+    if getattr(_audit_prepared, 'connection', None) is raw_connection:
+        return
+    columns = ('id',) + tuple(name for name, _ in _AUDIT_LOG_COLUMNS)
+    cursor.execute(
+        'PREPARE audit_log_insert ({types}) AS '
+        'INSERT INTO {table} ({columns}) '
+        'SELECT {columns} FROM unnest({params}) AS t({columns})'.format(
+            types=', '.join(f'{pg_type}[]' for pg_type in _AUDIT_LOG_PREPARED_TYPES),
+            table=AuditLog._meta.db_table,
+            columns=', '.join(columns),
+            params=', '.join(f'${i}' for i in range(1, len(columns) + 1)),
+        )
+    )
+    _audit_prepared.connection = raw_connection
+
+
+def _insert_audit_rows_postgres(payloads):
+    """Insert audit rows straight through psycopg2, skipping model instances."""
+    from psycopg2.extras import Json, execute_values
+
+    rows = [
+        (str(uuid.uuid4()),) + tuple(
+            Json(payload[name]) if name == 'context' else payload[name]
+            for name, _ in _AUDIT_LOG_COLUMNS
+        )
+        for payload in payloads
+    ]
+    with connection.cursor() as cursor:
+        raw_cursor = cursor.cursor
+        if getattr(settings, 'AUDIT_LOG_PREPARED_INSERT', False):
+            _prepare_audit_insert(raw_cursor)
+            raw_cursor.execute(
+                'EXECUTE audit_log_insert ({})'.format(', '.join(f'%s::{pg_type}[]' for pg_type in _AUDIT_LOG_PREPARED_TYPES)),
+                [list(column) for column in zip(*rows)],
+            )
+            return
+        sql = 'INSERT INTO {} (id, {}) VALUES %s'.format(
+            AuditLog._meta.db_table, ', '.join(name for name, _ in _AUDIT_LOG_COLUMNS)
+        )
+        template = '({})'.format(', '.join(['%s'] * (len(_AUDIT_LOG_COLUMNS) + 1)))
+        execute_values(raw_cursor, sql, rows, template=template, page_size=AUDIT_LOG_BATCH_SIZE)
+
+
+def _write_audit_batch(payloads):
+    """Insert queued audit rows with one bulk INSERT, falling back to per-row writes."""
+    if not payloads:
+        return
+    try:
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                _insert_audit_rows_postgres(payloads)
+            else:
+                AuditLog.objects.bulk_create(
+                    [AuditLog(**payload) for payload in payloads],
+                    batch_size=AUDIT_LOG_BATCH_SIZE,
+                )
+    except Exception as e:
+        # A single bad row (e.g. a document deleted meanwhile) must not drop the batch
+        logger.warning(f"Bulk audit log write failed, retrying row by row: {e}")
+        for payload in payloads:
+            _write_audit_entry(payload)
+
+
+def _drain_audit_queue(first=None):
+    """Collect up to AUDIT_LOG_BATCH_SIZE queued payloads without blocking."""
+    payloads = [] if first is None else [first]
+    while len(payloads) < AUDIT_LOG_BATCH_SIZE:
+        try:
+            payloads.append(_audit_queue.get_nowait())
+        except queue.Empty:
+            break
+    return payloads
+
+
+def _audit_worker_loop():
+    """Drain the audit queue, writing each batch with the worker's own connection."""
+    while True:
+        payloads = _drain_audit_queue(_audit_queue.get())
+        close_old_connections()
+        _write_audit_batch(payloads)
+        for _ in payloads:
+            _audit_queue.task_done()
+
+
+def _flush_audit_queue():
+    """Write whatever is still queued (called at interpreter shutdown)."""
+    while True:
+        payloads = _drain_audit_queue()
+        if not payloads:
+            return
+        _write_audit_batch(payloads)
+        for _ in payloads:
+            _audit_queue.task_done()
+
+
+def _ensure_audit_worker():
+    global _audit_worker
+    if _audit_worker is not None and _audit_worker.is_alive():
+        return
+    with _audit_worker_lock:
+        if _audit_worker is None or not _audit_worker.is_alive():
+            _audit_worker = threading.Thread(target=_audit_worker_loop, name='audit-log-writer', daemon=True)
+            _audit_worker.start()
+
+
+atexit.register(_flush_audit_queue)
+
+
 def log_audit_event(
     action: str,
     request=None,
@@ -40,6 +220,9 @@ def log_audit_event(
     """
     Log an audit event.
     
+    The row is queued for the background writer unless AUDIT_LOG_ASYNC is
+    disabled, in which case it is inserted synchronously.
+    
     Args:
         action: Action type (VIEW, EDIT, SHARE, EXPORT)
         request: Django request object (optional, for IP/user-agent extraction)
@@ -55,33 +238,37 @@ def log_audit_event(
         if request and not actor_user and hasattr(request, 'user') and request.user.is_authenticated:
             actor_user = request.user
         
-        # Extract IP and user agent from request
+        # Extract IP and user agent from request (request.META never leaves this thread)
         ip = None
         user_agent = None
         if request:
             ip = get_client_ip(request)
             user_agent = get_user_agent(request)
         
-        # Create audit log entry
-        audit_entry = AuditLog.objects.create(
-            actor_user=actor_user,
-            action=action,
-            document=document,
-            version_no=version_no,
-            ts=timezone.now(),
-            ip=ip,
-            user_agent=user_agent,
-            context=context or {},
-            share_link=share_link,
-            qr_link=qr_link
-        )
+        # Reference related rows by id so the payload holds no model instances
+        payload = {
+            'ts': timezone.now(),
+            'actor_user_id': actor_user.pk if actor_user else None,
+            'action': action,
+            'document_id': document.pk if document else None,
+            'version_no': version_no,
+            'ip': ip,
+            'user_agent': user_agent,
+            'context': context or {},
+            'share_link_id': share_link.pk if share_link else None,
+            'qr_link_id': qr_link.pk if qr_link else None,
+        }
+        
+        if getattr(settings, 'AUDIT_LOG_ASYNC', True):
+            _ensure_audit_worker()
+            _audit_queue.put(payload)
+        else:
+            _write_audit_entry(payload)
         
-        logger.info(f"Audit log created: {action} by {actor_user} on document {document}")
-        return audit_entry
+        logger.info(f"Audit log queued: {action} by {actor_user} on document {document}")
         
     except Exception as e:
         logger.error(f"Failed to create audit log: {e}")
-        return None
 
 
 def log_document_view(request, document, version_no=None, share_link=None, qr_link=None):
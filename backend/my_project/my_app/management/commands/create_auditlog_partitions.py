@@ -0,0 +1,64 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+
+class Command(BaseCommand):
+    help = 'Create monthly AuditLog partitions ahead of time (run monthly, e.g. from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, default=3, help='Number of upcoming months to create')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            self.stdout.write(self.style.WARNING('AuditLog partitioning requires PostgreSQL; nothing to do.'))
+            return
+
+        today = date.today()
+        year, month = today.year, today.month
+        created = moved = 0
+        with transaction.atomic(), connection.cursor() as cursor:
+            for _ in range(options['months'] + 1):
+                start = date(year, month, 1)
+                year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+                end = date(year, month, 1)
+                name = f'my_app_auditlog_{start:%Y_%m}'
+                cursor.execute('SELECT to_regclass(%s)', [name])
+                if cursor.fetchone()[0] is not None:
+                    continue
+                moved += self._create_partition(cursor, name, start, end)
+                created += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {created} AuditLog partition(s), moved {moved} row(s) out of the default partition.'
+        ))
+
+    def _create_partition(self, cursor, name, start, end):
+        """Create the partition for [start, end) and return how many rows it took over.
+
+        Postgres refuses a new partition while the DEFAULT partition holds rows in
+        its range, so those rows are moved with the default partition detached.
+        """
+        cursor.execute(
+            'SELECT count(*) FROM my_app_auditlog_default WHERE ts >= %s AND ts < %s',
+            [start, end],
+        )
+        count = cursor.fetchone()[0]
+        if not count:
+            cursor.execute(
+                f'CREATE TABLE "{name}" PARTITION OF my_app_auditlog FOR VALUES FROM (%s) TO (%s)',
+                [start, end],
+            )
+            return 0
+        cursor.execute('ALTER TABLE my_app_auditlog DETACH PARTITION my_app_auditlog_default')
+        cursor.execute(
+            f'CREATE TABLE "{name}" PARTITION OF my_app_auditlog FOR VALUES FROM (%s) TO (%s)',
+            [start, end],
+        )
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM my_app_auditlog_default WHERE ts >= %s AND ts < %s RETURNING *) '
+            f'INSERT INTO "{name}" SELECT * FROM moved',
+            [start, end],
+        )
+        cursor.execute('ALTER TABLE my_app_auditlog ATTACH PARTITION my_app_auditlog_default DEFAULT')
+        return count
@@ -3,18 +3,32 @@ from django.contrib.auth import get_user_model
 from my_app.models import UserProfile, ApprovalStatus
 
 
+BATCH_SIZE = 1000
+
+
 class Command(BaseCommand):
     help = 'Set all existing users to approved status with email verified for backward compatibility'
 
     def handle(self, *args, **options):
         User = get_user_model()
-        users = User.objects.all()
-        count = 0
-        for user in users:
-            profile, created = UserProfile.objects.get_or_create(user=user)
-            if profile.approval_status != ApprovalStatus.APPROVED or not profile.email_verified:
-                profile.approval_status = ApprovalStatus.APPROVED
-                profile.email_verified = True
-                profile.save(update_fields=['approval_status', 'email_verified'])
-                count += 1
+
+        # Create missing profiles already approved
+        existing_user_ids = UserProfile.objects.values_list('user_id', flat=True)
+        missing = [
+            UserProfile(user_id=user_id, approval_status=ApprovalStatus.APPROVED, email_verified=True)
+            for user_id in User.objects.exclude(id__in=existing_user_ids).values_list('id', flat=True)
+        ]
+        UserProfile.objects.bulk_create(missing, batch_size=BATCH_SIZE)
+
+        # Approve existing profiles that still need it
+        to_fix = list(
+            UserProfile.objects.exclude(approval_status=ApprovalStatus.APPROVED, email_verified=True)
+            .only('id', 'approval_status', 'email_verified')
+        )
+        for profile in to_fix:
+            profile.approval_status = ApprovalStatus.APPROVED
+            profile.email_verified = True
+        UserProfile.objects.bulk_update(to_fix, ['approval_status', 'email_verified'], batch_size=BATCH_SIZE)
+
+        count = len(missing) + len(to_fix)
         self.stdout.write(self.style.SUCCESS(f'Updated {count} user(s) to approved status.'))
@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_app', '0014_alter_userprofile_avatar'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='acl',
+            index=models.Index(fields=['document', 'subject_type', 'subject_id'], name='acl_doc_subj_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='acl',
+            index=models.Index(fields=['document', 'expires_at'], name='acl_doc_exp_idx'),
+        ),
+    ]
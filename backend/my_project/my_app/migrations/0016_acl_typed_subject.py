@@ -0,0 +1,40 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Copy user/group subject ids into the typed columns. ACL rows whose user or
+# group no longer exists keep NULL typed columns; 0017 refuses to add its
+# constraint until they are cleaned up.
+BACKFILL_SQL = r'''
+UPDATE my_app_acl AS acl SET subject_user_id = u.id
+  FROM auth_user AS u
+  WHERE acl.subject_type = 'user' AND acl.subject_id = u.id::text;
+
+UPDATE my_app_acl AS acl SET subject_group_id = g.id
+  FROM auth_group AS g
+  WHERE acl.subject_type = 'group' AND acl.subject_id = g.id::text;
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('my_app', '0015_acl_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='acl',
+            name='subject_user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='subject_acls', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='acl',
+            name='subject_group',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='subject_acls', to='auth.group'),
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+    ]
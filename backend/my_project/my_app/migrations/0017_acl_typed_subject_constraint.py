@@ -0,0 +1,44 @@
+from django.db import migrations, models
+
+
+def check_unresolved_subjects(apps, schema_editor):
+    """Fail before adding the constraint if 0016 left user/group ACLs without a typed subject.
+
+    Those rows reference a user or group that no longer exists. They are not
+    deleted here; remove or fix them by hand, then migrate again.
+    """
+    ACL = apps.get_model('my_app', 'ACL')
+    unresolved = list(
+        ACL.objects.filter(
+            models.Q(subject_type='user', subject_user__isnull=True)
+            | models.Q(subject_type='group', subject_group__isnull=True)
+        ).order_by('pk').values_list('pk', 'subject_type', 'subject_id')
+    )
+    if unresolved:
+        rows = ', '.join(f'{pk} ({subject_type} {subject_id!r})' for pk, subject_type, subject_id in unresolved)
+        raise RuntimeError(
+            f'Cannot add acl_typed_subject: {len(unresolved)} ACL row(s) reference a missing user or group. '
+            f'Delete or fix them and migrate again. ACL ids: {rows}'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_app', '0016_acl_typed_subject'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_unresolved_subjects, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='acl',
+            constraint=models.CheckConstraint(
+                condition=(
+                    models.Q(subject_type='user', subject_user__isnull=False, subject_group__isnull=True)
+                    | models.Q(subject_type='group', subject_group__isnull=False, subject_user__isnull=True)
+                    | models.Q(subject_type='share_link', subject_user__isnull=True, subject_group__isnull=True)
+                ),
+                name='acl_typed_subject',
+            ),
+        ),
+    ]
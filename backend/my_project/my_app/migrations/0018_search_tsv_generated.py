@@ -0,0 +1,95 @@
+import django.contrib.postgres.search
+from django.db import migrations, models
+from django.db.models.expressions import RawSQL
+
+
+DOCUMENT_SEARCH_TSV_SQL = "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(text, ''))"
+VERSION_SEARCH_TSV_SQL = "to_tsvector('english', coalesce(text, ''))"
+
+
+# Replace the trigger-maintained columns from 0004 with STORED generated
+# columns (Postgres 12+). Dropping the columns also drops their GIN indexes,
+# so those are recreated afterwards.
+FORWARD_SQL = rf'''
+DROP TRIGGER IF EXISTS trg_document_version_search_tsv ON my_app_documentversion;
+DROP TRIGGER IF EXISTS trg_document_search_tsv ON my_app_document;
+DROP FUNCTION IF EXISTS my_app_update_version_search_tsv();
+DROP FUNCTION IF EXISTS my_app_update_document_search_tsv();
+
+ALTER TABLE my_app_document
+  DROP COLUMN search_tsv,
+  ADD COLUMN search_tsv tsvector GENERATED ALWAYS AS ({DOCUMENT_SEARCH_TSV_SQL}) STORED;
+ALTER TABLE my_app_documentversion
+  DROP COLUMN search_tsv,
+  ADD COLUMN search_tsv tsvector GENERATED ALWAYS AS ({VERSION_SEARCH_TSV_SQL}) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_document_search_tsv ON my_app_document USING GIN (search_tsv);
+CREATE INDEX IF NOT EXISTS idx_documentversion_search_tsv ON my_app_documentversion USING GIN (search_tsv);
+'''
+
+
+REVERSE_SQL = r'''
+ALTER TABLE my_app_document
+  DROP COLUMN search_tsv,
+  ADD COLUMN search_tsv tsvector NULL;
+ALTER TABLE my_app_documentversion
+  DROP COLUMN search_tsv,
+  ADD COLUMN search_tsv tsvector NULL;
+
+CREATE OR REPLACE FUNCTION my_app_update_document_search_tsv() RETURNS trigger AS $$
+BEGIN
+  NEW.search_tsv := to_tsvector('english', coalesce(NEW.title,'') || ' ' || coalesce(NEW.text,''));
+  RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION my_app_update_version_search_tsv() RETURNS trigger AS $$
+BEGIN
+  NEW.search_tsv := to_tsvector('english', coalesce(NEW.text,''));
+  RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_document_search_tsv
+BEFORE INSERT OR UPDATE OF title, text ON my_app_document
+FOR EACH ROW EXECUTE FUNCTION my_app_update_document_search_tsv();
+
+CREATE TRIGGER trg_document_version_search_tsv
+BEFORE INSERT OR UPDATE OF text ON my_app_documentversion
+FOR EACH ROW EXECUTE FUNCTION my_app_update_version_search_tsv();
+
+UPDATE my_app_document SET search_tsv = to_tsvector('english', coalesce(title,'') || ' ' || coalesce(text,''));
+UPDATE my_app_documentversion SET search_tsv = to_tsvector('english', coalesce(text,''));
+
+CREATE INDEX IF NOT EXISTS idx_document_search_tsv ON my_app_document USING GIN (search_tsv);
+CREATE INDEX IF NOT EXISTS idx_documentversion_search_tsv ON my_app_documentversion USING GIN (search_tsv);
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_app', '0017_acl_typed_subject_constraint'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(FORWARD_SQL, REVERSE_SQL),
+            ],
+            state_operations=[
+                migrations.RemoveField(model_name='document', name='search_tsv'),
+                migrations.AddField(
+                    model_name='document',
+                    name='search_tsv',
+                    field=models.GeneratedField(db_persist=True, expression=RawSQL(DOCUMENT_SEARCH_TSV_SQL, ()), help_text='Full-text search vector', output_field=django.contrib.postgres.search.SearchVectorField()),
+                ),
+                migrations.RemoveField(model_name='documentversion', name='search_tsv'),
+                migrations.AddField(
+                    model_name='documentversion',
+                    name='search_tsv',
+                    field=models.GeneratedField(db_persist=True, expression=RawSQL(VERSION_SEARCH_TSV_SQL, ()), output_field=django.contrib.postgres.search.SearchVectorField()),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,29 @@
+from django.db import migrations, models
+
+
+def backfill_primary_qr_code(apps, schema_editor):
+    Document = apps.get_model('my_app', 'Document')
+    QRLink = apps.get_model('my_app', 'QRLink')
+    primary_codes = {}
+    for document_id, code in QRLink.objects.filter(active=True).order_by('document_id', '-created_at').values_list('document_id', 'code'):
+        primary_codes.setdefault(document_id, code)
+    documents = list(Document.objects.filter(pk__in=primary_codes).only('id'))
+    for document in documents:
+        document.primary_qr_code = primary_codes[document.id]
+    Document.objects.bulk_update(documents, ['primary_qr_code'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_app', '0019_auditlog_context_gin'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='primary_qr_code',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=255, null=True),
+        ),
+        migrations.RunPython(backfill_primary_qr_code, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,115 @@
+from django.db import migrations
+
+
+# Rebuild my_app_auditlog as a table range-partitioned by month on ts.
+# Postgres requires the partition key in the primary key, so the key becomes
+# (id, ts); ids are still random UUIDs. Indexes and foreign keys are moved
+# over from the old table under their existing names so later schema changes
+# keep finding them. A DEFAULT partition catches rows outside the monthly
+# partitions; run `manage.py create_auditlog_partitions` ahead of each month.
+PARTITION_SQL = r'''
+ALTER TABLE my_app_auditlog RENAME TO my_app_auditlog_old;
+ALTER TABLE my_app_auditlog_old RENAME CONSTRAINT my_app_auditlog_pkey TO my_app_auditlog_old_pkey;
+
+CREATE TABLE my_app_auditlog (
+  LIKE my_app_auditlog_old INCLUDING DEFAULTS INCLUDING CONSTRAINTS,
+  CONSTRAINT my_app_auditlog_pkey PRIMARY KEY (id, ts)
+) PARTITION BY RANGE (ts);
+
+CREATE TABLE my_app_auditlog_default PARTITION OF my_app_auditlog DEFAULT;
+
+DO $$
+DECLARE
+  month_start date := date_trunc('month', coalesce((SELECT min(ts) FROM my_app_auditlog_old), now()));
+  last_month date := date_trunc('month', now() + interval '3 months');
+BEGIN
+  WHILE month_start <= last_month LOOP
+    EXECUTE format(
+      'CREATE TABLE IF NOT EXISTS %I PARTITION OF my_app_auditlog FOR VALUES FROM (%L) TO (%L)',
+      'my_app_auditlog_' || to_char(month_start, 'YYYY_MM'),
+      month_start,
+      month_start + interval '1 month'
+    );
+    month_start := month_start + interval '1 month';
+  END LOOP;
+END $$;
+
+INSERT INTO my_app_auditlog SELECT * FROM my_app_auditlog_old;
+
+DO $$
+DECLARE
+  r record;
+BEGIN
+  FOR r IN
+    SELECT conname, pg_get_constraintdef(oid) AS condef
+    FROM pg_constraint
+    WHERE conrelid = 'my_app_auditlog_old'::regclass AND contype = 'f'
+  LOOP
+    EXECUTE format('ALTER TABLE my_app_auditlog_old DROP CONSTRAINT %I', r.conname);
+    EXECUTE format('ALTER TABLE my_app_auditlog ADD CONSTRAINT %I %s', r.conname, r.condef);
+  END LOOP;
+
+  FOR r IN
+    SELECT indexname, indexdef
+    FROM pg_indexes
+    WHERE tablename = 'my_app_auditlog_old' AND indexname <> 'my_app_auditlog_old_pkey'
+  LOOP
+    EXECUTE format('DROP INDEX %I', r.indexname);
+    EXECUTE replace(r.indexdef, 'my_app_auditlog_old', 'my_app_auditlog');
+  END LOOP;
+END $$;
+
+DROP TABLE my_app_auditlog_old;
+'''
+
+# Reverse: copy the rows back into a plain table keyed by id alone, moving
+# indexes and foreign keys over the same way. Partitioned indexes report their
+# definition as "ON ONLY <table>", which is dropped for the plain table.
+UNPARTITION_SQL = r'''
+ALTER TABLE my_app_auditlog RENAME TO my_app_auditlog_partitioned;
+ALTER TABLE my_app_auditlog_partitioned RENAME CONSTRAINT my_app_auditlog_pkey TO my_app_auditlog_partitioned_pkey;
+
+CREATE TABLE my_app_auditlog (
+  LIKE my_app_auditlog_partitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS,
+  CONSTRAINT my_app_auditlog_pkey PRIMARY KEY (id)
+);
+
+INSERT INTO my_app_auditlog SELECT * FROM my_app_auditlog_partitioned;
+
+DO $$
+DECLARE
+  r record;
+BEGIN
+  FOR r IN
+    SELECT conname, pg_get_constraintdef(oid) AS condef
+    FROM pg_constraint
+    WHERE conrelid = 'my_app_auditlog_partitioned'::regclass AND contype = 'f'
+  LOOP
+    EXECUTE format('ALTER TABLE my_app_auditlog_partitioned DROP CONSTRAINT %I', r.conname);
+    EXECUTE format('ALTER TABLE my_app_auditlog ADD CONSTRAINT %I %s', r.conname, r.condef);
+  END LOOP;
+
+  FOR r IN
+    SELECT indexname, indexdef
+    FROM pg_indexes
+    WHERE tablename = 'my_app_auditlog_partitioned' AND indexname <> 'my_app_auditlog_partitioned_pkey'
+  LOOP
+    EXECUTE format('DROP INDEX %I', r.indexname);
+    EXECUTE replace(replace(r.indexdef, ' ON ONLY ', ' ON '), 'my_app_auditlog_partitioned', 'my_app_auditlog');
+  END LOOP;
+END $$;
+
+-- Drops the monthly and default partitions with it
+DROP TABLE my_app_auditlog_partitioned;
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_app', '0020_document_primary_qr_code'),
+    ]
+
+    operations = [
+        migrations.RunSQL(PARTITION_SQL, UNPARTITION_SQL),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_app', '0023_auditlog_ts_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='qrlink',
+            index=models.Index(fields=['document', 'active', '-created_at'], name='qrlink_doc_active_idx'),
+        ),
+    ]
@@ -1,10 +1,19 @@
 from django.db import models
+from django.db.models import OuterRef, Prefetch, Subquery
+from django.db.models.expressions import RawSQL
 from django.urls import reverse
 from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from django.contrib.postgres.indexes import GinIndex
 from django.contrib.postgres.search import SearchVectorField
 import uuid
 
 
+# Full-text vectors are maintained by Postgres as STORED generated columns
+DOCUMENT_SEARCH_TSV_SQL = "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(text, ''))"
+VERSION_SEARCH_TSV_SQL = "to_tsvector('english', coalesce(text, ''))"
+
 class Role(models.TextChoices):
 	OWNER = "OWNER", "OWNER"
 	EDITOR = "EDITOR", "EDITOR"
@@ -24,6 +33,30 @@ class RelationType(models.TextChoices):
 	REFERENCES = "REFERENCES", "REFERENCES"
 
 
+# Document columns that list views never render
+DOCUMENT_LARGE_FIELDS = ('html', 'text', 'search_tsv', 'qr_code_data')
+
+
+class DocumentQuerySet(models.QuerySet):
+	def with_related(self):
+		"""Load the owner, attachments, labels and collections the document serializers render."""
+		return self.select_related('owner').prefetch_related(
+			Prefetch('attachments', queryset=Attachment.objects.defer('data').order_by('created_at')),
+			Prefetch('documentlabel_set', queryset=DocumentLabel.objects.select_related('label').only(
+				'document', 'label', 'label__name',
+			)),
+			Prefetch('documentcollection_set', queryset=DocumentCollection.objects.select_related('collection').only(
+				'document', 'collection', 'collection__name', 'collection__parent', 'collection__owner',
+			)),
+		)
+
+	def for_listing(self):
+		"""Defer the large columns list views never read and flag QR presence instead."""
+		return self.defer(*DOCUMENT_LARGE_FIELDS).annotate(
+			has_qr_code=models.ExpressionWrapper(models.Q(qr_code_data__isnull=False), output_field=models.BooleanField())
+		)
+
+
 class Document(models.Model):
 	"""
 	Document core record. Aligns with PlantUML schema.
@@ -37,18 +70,26 @@ class Document(models.Model):
 	# New fields as per schema
 	html = models.TextField(blank=True, null=True, help_text="HTML source of truth for the document")
 	text = models.TextField(blank=True, null=True, help_text="Plain text generated from HTML for search indexing")
-	search_tsv = SearchVectorField(null=True, help_text="Full-text search vector")
+	search_tsv = models.GeneratedField(expression=RawSQL(DOCUMENT_SEARCH_TSV_SQL, ()), output_field=SearchVectorField(), db_persist=True, help_text="Full-text search vector")
 	owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.RESTRICT, related_name='owned_documents', null=True, blank=True)
 	current_version_no = models.IntegerField(default=1, help_text="Current version number")
 	# QR code image stored as binary in the database (Neon cloud DB)
 	qr_code_data = models.BinaryField(blank=True, null=True, help_text="QR code PNG image stored as binary in the database")
+	# Code of the newest active QRLink, kept in sync by QRLink.save()
+	primary_qr_code = models.CharField(max_length=255, null=True, blank=True, db_index=True, editable=False)
 	created_at = models.DateTimeField(auto_now_add=True)
 	updated_at = models.DateTimeField(auto_now=True)
 
+	objects = DocumentQuerySet.as_manager()
+
 	class Meta:
 		ordering = ['-created_at']
 		verbose_name = 'Document'
 		verbose_name_plural = 'Documents'
+		indexes = [
+			# Standard search filters on title__icontains (ILIKE '%q%')
+			GinIndex(fields=['title'], name='document_title_trgm', opclasses=['gin_trgm_ops']),
+		]
 
 	def __str__(self):
 		return f"{self.title} (ID: {self.id})"
@@ -59,9 +100,8 @@ class Document(models.Model):
 	def get_qr_code_resolve_url(self) -> str:
 		"""Return the QR resolve URL using the primary active QRLink if any."""
 		base_url = getattr(settings, 'BASE_URL', 'http://localhost:8000')
-		primary_qr = QRLink.objects.filter(document=self, active=True).order_by('-created_at').first()
-		if primary_qr:
-			return f"{base_url}/api/qr/resolve/{primary_qr.code}/"
+		if self.primary_qr_code:
+			return f"{base_url}/api/qr/resolve/{self.primary_qr_code}/"
 		return f"{base_url}/api/documents/{self.id}/"
 
 	def delete(self, *args, **kwargs):
@@ -91,7 +131,7 @@ class DocumentVersion(models.Model):
 	version_no = models.IntegerField()
 	html = models.TextField(blank=True, null=True)
 	text = models.TextField(blank=True, null=True)
-	search_tsv = SearchVectorField(null=True)
+	search_tsv = models.GeneratedField(expression=RawSQL(VERSION_SEARCH_TSV_SQL, ()), output_field=SearchVectorField(), db_persist=True)
 	author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.RESTRICT, related_name='authored_versions', null=True, blank=True)
 	change_note = models.TextField(blank=True, null=True)
 	hash = models.TextField(blank=True, null=True)
@@ -159,11 +199,61 @@ class ACL(models.Model):
 	document = models.ForeignKey(Document, on_delete=models.CASCADE, related_name='acls')
 	subject_type = models.CharField(max_length=16, choices=(('user', 'user'), ('group', 'group'), ('share_link', 'share_link')))
 	subject_id = models.TextField()
+	# Typed copies of subject_id for user/group subjects, kept in sync by save()
+	subject_user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='subject_acls', null=True, blank=True)
+	subject_group = models.ForeignKey('auth.Group', on_delete=models.CASCADE, related_name='subject_acls', null=True, blank=True)
 	role = models.CharField(max_length=16, choices=Role.choices)
 	expires_at = models.DateTimeField(null=True, blank=True)
 	created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.RESTRICT, related_name='created_acls', null=True, blank=True)
 	created_at = models.DateTimeField(auto_now_add=True)
 
+	class Meta:
+		indexes = [
+			# Permission checks look up (document, subject) pairs
+			models.Index(fields=['document', 'subject_type', 'subject_id'], name='acl_doc_subj_idx'),
+			models.Index(fields=['document', 'expires_at'], name='acl_doc_exp_idx'),
+		]
+		constraints = [
+			models.CheckConstraint(
+				condition=(
+					models.Q(subject_type='user', subject_user__isnull=False, subject_group__isnull=True)
+					| models.Q(subject_type='group', subject_group__isnull=False, subject_user__isnull=True)
+					| models.Q(subject_type='share_link', subject_user__isnull=True, subject_group__isnull=True)
+				),
+				name='acl_typed_subject',
+			),
+		]
+
+	def _typed_subject_id(self):
+		"""subject_id as the integer key of a user or group subject."""
+		try:
+			return int(self.subject_id)
+		except (TypeError, ValueError):
+			raise ValidationError({'subject_id': f'{self.subject_type} subject_id must be an integer id, got {self.subject_id!r}'})
+
+	def clean(self):
+		super().clean()
+		if self.subject_type in ('user', 'group') and self.subject_user_id is None and self.subject_group_id is None:
+			self._typed_subject_id()
+
+	def save(self, *args, **kwargs):
+		# Callers set subject_user / subject_group; subject_id is kept as their text copy.
+		# A bare subject_id is still accepted and converted once.
+		if self.subject_type == 'user':
+			if self.subject_user_id is None:
+				self.subject_user_id = self._typed_subject_id()
+			self.subject_id = str(self.subject_user_id)
+			self.subject_group_id = None
+		elif self.subject_type == 'group':
+			if self.subject_group_id is None:
+				self.subject_group_id = self._typed_subject_id()
+			self.subject_id = str(self.subject_group_id)
+			self.subject_user_id = None
+		else:
+			self.subject_user_id = None
+			self.subject_group_id = None
+		super().save(*args, **kwargs)
+
 
 class ShareLink(models.Model):
 	id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -176,6 +266,36 @@ class ShareLink(models.Model):
 	created_at = models.DateTimeField(auto_now_add=True)
 
 
+def refresh_primary_qr_codes(document_ids) -> None:
+	"""Recompute Document.primary_qr_code from the newest active QRLink of each given document."""
+	document_ids = set(document_ids)
+	if not document_ids:
+		return
+	newest_active = QRLink.objects.filter(document_id=OuterRef('pk'), active=True).order_by('-created_at').values('code')[:1]
+	Document.objects.filter(pk__in=document_ids).update(primary_qr_code=Subquery(newest_active))
+
+
+def qrlink_deleted(sender, instance, **kwargs):
+	"""post_delete receiver for QRLink: the deleted link may have been its document's primary code."""
+	refresh_primary_qr_codes([instance.document_id])
+
+
+class QRLinkQuerySet(models.QuerySet):
+	"""Keeps Document.primary_qr_code in sync for writes that bypass QRLink.save()."""
+
+	def update(self, **kwargs):
+		# Collect the documents first: the update may change what the filter matches
+		document_ids = set(self.values_list('document_id', flat=True))
+		rows = super().update(**kwargs)
+		refresh_primary_qr_codes(document_ids)
+		return rows
+
+	def bulk_create(self, objs, *args, **kwargs):
+		objs = super().bulk_create(objs, *args, **kwargs)
+		refresh_primary_qr_codes(obj.document_id for obj in objs)
+		return objs
+
+
 class QRLink(models.Model):
 	id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 	document = models.ForeignKey(Document, on_delete=models.CASCADE, related_name='qr_links')
@@ -187,6 +307,23 @@ class QRLink(models.Model):
 	created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.RESTRICT, related_name='created_qr_links', null=True, blank=True)
 	created_at = models.DateTimeField(auto_now_add=True)
 
+	objects = QRLinkQuerySet.as_manager()
+
+	def save(self, *args, **kwargs):
+		super().save(*args, **kwargs)
+		# Refresh the denormalized primary code on the document (deletes and
+		# queryset writes go through qrlink_deleted and QRLinkQuerySet)
+		primary_code = QRLink.objects.filter(document_id=self.document_id, active=True).order_by('-created_at').values_list('code', flat=True).first()
+		Document.objects.filter(pk=self.document_id).update(primary_qr_code=primary_code)
+		if QRLink.document.is_cached(self):
+			self.document.primary_qr_code = primary_code
+
+	class Meta:
+		indexes = [
+			# Newest active link per document (save() and QR generation)
+			models.Index(fields=['document', 'active', '-created_at'], name='qrlink_doc_active_idx'),
+		]
+
 
 class AuditLog(models.Model):
 	id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -194,13 +331,27 @@ class AuditLog(models.Model):
 	action = models.CharField(max_length=16, choices=Action.choices)
 	document = models.ForeignKey(Document, null=True, blank=True, on_delete=models.SET_NULL)
 	version_no = models.IntegerField(null=True, blank=True)
-	ts = models.DateTimeField(auto_now_add=True)
+	# Stamped when the event is logged, not when the background writer inserts it
+	ts = models.DateTimeField(default=timezone.now, editable=False)
 	ip = models.GenericIPAddressField(null=True, blank=True)
 	user_agent = models.TextField(null=True, blank=True)
 	context = models.JSONField(null=True, blank=True)
 	share_link = models.ForeignKey(ShareLink, null=True, blank=True, on_delete=models.SET_NULL)
 	qr_link = models.ForeignKey(QRLink, null=True, blank=True, on_delete=models.SET_NULL)
 
+	class Meta:
+		# The table is range-partitioned by month on ts (migration 0021), so the
+		# database primary key is (id, ts), not id alone: nothing can hold a
+		# foreign key to AuditLog.id.
+		indexes = [
+			# Share polling matches revocations with context @> {'revoked_from': ...}
+			GinIndex(fields=['context'], name='auditlog_ctx_gin', opclasses=['jsonb_path_ops']),
+			# Newest-first activity per document / per user, and share polling by action
+			models.Index(fields=['document', '-ts'], name='auditlog_doc_ts_idx'),
+			models.Index(fields=['actor_user', '-ts'], name='auditlog_user_ts_idx'),
+			models.Index(fields=['action', '-ts'], name='auditlog_act_ts_idx'),
+		]
+
 
 class ApprovalStatus(models.TextChoices):
 	PENDING_VERIFICATION = 'pending_verification', 'Pending Verification'
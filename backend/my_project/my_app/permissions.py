@@ -12,12 +12,35 @@ ROLE_HIERARCHY = {
 	Role.VIEWER: 1,
 }
 
+# Actions each role may perform
+ROLE_PERMISSIONS = {
+	Role.OWNER: frozenset((Action.VIEW, Action.EDIT, Action.SHARE, Action.EXPORT)),
+	Role.EDITOR: frozenset((Action.VIEW, Action.EDIT, Action.EXPORT)),
+	Role.VIEWER: frozenset((Action.VIEW, Action.EXPORT)),
+}
+
 
-def get_user_effective_role(user, document: Document) -> str:
+def get_user_group_ids(user) -> list:
+	"""Return the ids of the user's groups, cached on the user object.
+	
+	request.user lives for the whole request, so permission checks on many
+	documents share a single groups query.
+	"""
+	group_ids = getattr(user, '_group_ids', None)
+	if group_ids is None:
+		group_ids = list(user.groups.values_list('id', flat=True))
+		user._group_ids = group_ids
+	return group_ids
+
+
+def get_user_effective_role(user, document: Document, request=None) -> str:
 	"""Get the highest role a user has for a document (ownership, direct ACL, or group ACL).
 	
 	When a user has multiple access rights (e.g., direct user ACL + group ACL),
 	this function resolves conflicts by returning the highest privilege role.
+	
+	If a request is given, the result is memoized on it per (user, document) so
+	repeated checks within the same request do not hit the database again.
 	"""
 	if not user or not user.is_authenticated:
 		return None
@@ -26,63 +49,97 @@ def get_user_effective_role(user, document: Document) -> str:
 	if user.is_staff or user.is_superuser:
 		return Role.OWNER
 	
-	# Collect all applicable roles
-	roles = []
-	
-	# Check ownership
+	# Ownership is the top of the hierarchy, no ACL can outrank it
 	if document.owner_id == user.id:
-		roles.append(Role.OWNER)
+		return Role.OWNER
 	
-	# Check direct user ACLs (filter out expired ones)
-	user_acl = ACL.objects.filter(
-		document=document, 
-		subject_type='user', 
-		subject_id=str(user.id)
-	).filter(
-		Q(expires_at__isnull=True) | Q(expires_at__gt=timezone.now())
-	).first()
-	if user_acl:
-		roles.append(user_acl.role)
+	if request is None:
+		return _resolve_effective_role(user, document)
 	
-	# Check group ACLs (filter out expired ones)
-	user_groups = user.groups.values_list('id', flat=True)
-	group_acls = ACL.objects.filter(
-		document=document,
-		subject_type='group',
-		subject_id__in=[str(group_id) for group_id in user_groups]
-	).filter(
-		Q(expires_at__isnull=True) | Q(expires_at__gt=timezone.now())
-	)
-	for acl in group_acls:
-		roles.append(acl.role)
+	role_cache = request.__dict__.setdefault('_role_cache', {})
+	key = (user.id, document.pk)
+	if key not in role_cache:
+		role_cache[key] = _resolve_effective_role(user, document)
+	return role_cache[key]
+
+
+def _acl_subject_filter(user) -> Q:
+	"""Unexpired ACL entries granted to the user directly or through one of their groups."""
+	group_ids = get_user_group_ids(user)
+	subject_q = Q(subject_user_id=user.id)
+	if group_ids:
+		subject_q |= Q(subject_group_id__in=group_ids)
+	return subject_q & (Q(expires_at__isnull=True) | Q(expires_at__gt=timezone.now()))
+
+
+def _resolve_effective_role(user, document: Document) -> str:
+	"""Compute the effective role of a non-admin, non-owner user from ACLs."""
+	best_role = None
+	best_rank = 0
 	
-	# If no roles found, user has no access
-	if not roles:
-		return None
+	# Check direct user ACLs and group ACLs in one query
+	acl_roles = ACL.objects.filter(document=document).filter(_acl_subject_filter(user)).values_list('role', flat=True)
 	
-	# Return highest privilege role (conflict resolution)
-	return max(roles, key=lambda r: ROLE_HIERARCHY.get(r, 0))
+	# Keep the highest privilege role (conflict resolution); None means no access
+	for role in acl_roles:
+		rank = ROLE_HIERARCHY.get(role, 0)
+		if rank > best_rank:
+			best_role, best_rank = role, rank
+	return best_role
 
 
-def user_can_perform_action(user, document: Document, action: str) -> bool:
+def get_effective_roles_bulk(user, documents) -> dict:
+	"""Resolve the effective role of a user for many documents with at most one ACL query.
+	
+	Returns a {document_pk: role} dict; documents the user cannot access map to None.
+	"""
+	if not user or not user.is_authenticated:
+		return {document.pk: None for document in documents}
+	if user.is_staff or user.is_superuser:
+		return {document.pk: Role.OWNER for document in documents}
+	
+	roles = {}
+	pending_ids = []
+	for document in documents:
+		if document.owner_id == user.id:
+			roles[document.pk] = Role.OWNER
+		else:
+			roles[document.pk] = None
+			pending_ids.append(document.pk)
+	
+	if pending_ids:
+		acl_roles = ACL.objects.filter(document_id__in=pending_ids).filter(
+			_acl_subject_filter(user)
+		).values_list('document_id', 'role')
+		for document_id, role in acl_roles:
+			if ROLE_HIERARCHY.get(role, 0) > ROLE_HIERARCHY.get(roles[document_id], 0):
+				roles[document_id] = role
+	return roles
+
+
+def prime_effective_roles(request, documents) -> None:
+	"""Fill the per-request role cache used by get_user_effective_role for many documents at once."""
+	user = getattr(request, 'user', None)
+	if not user or not user.is_authenticated:
+		return
+	role_cache = request.__dict__.setdefault('_role_cache', {})
+	missing = [document for document in documents if (user.id, document.pk) not in role_cache]
+	for document_pk, role in get_effective_roles_bulk(user, missing).items():
+		role_cache[(user.id, document_pk)] = role
+
+
+def user_can_perform_action(user, document: Document, action: str, request=None) -> bool:
 	"""Check if user can perform a specific action on a document based on their role."""
-	role = get_user_effective_role(user, document)
+	role = get_user_effective_role(user, document, request=request)
 	if not role:
 		return False
 	
-	# Define what each role can do
-	role_permissions = {
-		Role.OWNER: [Action.VIEW, Action.EDIT, Action.SHARE, Action.EXPORT],
-		Role.EDITOR: [Action.VIEW, Action.EDIT, Action.EXPORT],
-		Role.VIEWER: [Action.VIEW, Action.EXPORT]
-	}
-	
-	return action in role_permissions.get(role, [])
+	return action in ROLE_PERMISSIONS.get(role, ())
 
 
-def user_has_document_access(user, document: Document) -> bool:
+def user_has_document_access(user, document: Document, request=None) -> bool:
 	"""Check if user has any access to a document."""
-	return get_user_effective_role(user, document) is not None
+	return get_user_effective_role(user, document, request=request) is not None
 
 
 class DocumentAccessPermission(BasePermission):
@@ -98,18 +155,23 @@ class DocumentAccessPermission(BasePermission):
 		
 		# Map HTTP methods to actions
 		if request.method in SAFE_METHODS:
-			return user_can_perform_action(request.user, obj, Action.VIEW)
+			return user_can_perform_action(request.user, obj, Action.VIEW, request=request)
 		elif request.method in ['PUT', 'PATCH']:
-			return user_can_perform_action(request.user, obj, Action.EDIT)
+			return user_can_perform_action(request.user, obj, Action.EDIT, request=request)
 		elif request.method == 'DELETE':
 			# Only owners can delete
-			role = get_user_effective_role(request.user, obj)
+			role = get_user_effective_role(request.user, obj, request=request)
 			return role == Role.OWNER
 		else:
-			return user_can_perform_action(request.user, obj, Action.EDIT)
+			return user_can_perform_action(request.user, obj, Action.EDIT, request=request)
 
 	def has_permission(self, request, view):
-		return request.user and request.user.is_authenticated
+		if not (request.user and request.user.is_authenticated):
+			return False
+		# Load group ids once for the object checks that follow
+		if not (request.user.is_staff or request.user.is_superuser):
+			get_user_group_ids(request.user)
+		return True
 
 
 class ShareLinkAccessPermission(BasePermission):
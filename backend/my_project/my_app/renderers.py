@@ -0,0 +1,45 @@
+"""
+orjson renderer whose output matches DRF's JSONRenderer for the data the API returns.
+"""
+
+import datetime
+import decimal
+
+import orjson
+from drf_orjson_renderer.renderers import ORJSONRenderer as BaseORJSONRenderer
+from rest_framework.renderers import JSONRenderer
+
+
+class ORJSONRenderer(BaseORJSONRenderer):
+    """
+    ORJSONRenderer with DRF's JSONEncoder conventions for the types orjson treats differently.
+
+    - UTC datetimes end in 'Z' rather than '+00:00'
+    - Decimal values are floats (serializers already coerce their own to strings)
+    - timedelta values are the string of their total seconds
+    - bytes are decoded
+    - non-string dict keys are stringified
+    - U+2028 and U+2029 are escaped, as DRF does for JavaScript compatibility
+    - anything orjson cannot encode (e.g. integers wider than 64 bits) goes through JSONRenderer
+
+    NaN and infinity still render as null, where JSONRenderer raises.
+    """
+
+    options = BaseORJSONRenderer.options | orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, media_type=None, renderer_context=None):
+        try:
+            ret = super().render(data, media_type, renderer_context)
+        except orjson.JSONEncodeError:
+            return JSONRenderer().render(data, media_type, renderer_context)
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+    @staticmethod
+    def default(obj):
+        if isinstance(obj, decimal.Decimal):
+            return float(obj)
+        if isinstance(obj, datetime.timedelta):
+            return str(obj.total_seconds())
+        if isinstance(obj, bytes):
+            return obj.decode()
+        return BaseORJSONRenderer.default(obj)
@@ -2,15 +2,157 @@
 Serializers for OCR functionality and Document management using Django REST Framework.
 """
 
+import copy
+import functools
+
 from rest_framework import serializers
 from django.core.files.uploadedfile import UploadedFile
-try:
-    from bs4 import BeautifulSoup
-except Exception:  # Fallback if bs4 isn't available in non-venv runs
-    BeautifulSoup = None
-from .models import Document, QRLink, Attachment, Label, Collection, ShareLink, ACL, DocumentVersion, AuditLog, Notification
+from django.db.models.manager import BaseManager
+from django.urls import get_script_prefix, reverse
+from django.utils import timezone
+from .models import Document, QRLink, Attachment, Label, Collection, ShareLink, ACL, DocumentVersion, AuditLog, Notification, Action
+from .permissions import get_user_effective_role, prime_effective_roles, ROLE_PERMISSIONS
 from django.contrib.auth.models import Group
 from .utils.ocr import is_supported_file_type, validate_file_size
+from .utils.html_text import html_to_text
+
+
+# Characters of version text shown in version history listings
+CONTENT_PREVIEW_LENGTH = 200
+
+# Actions reported in a document's user_permissions, in display order
+DOCUMENT_ACTIONS = (Action.VIEW, Action.EDIT, Action.SHARE, Action.EXPORT)
+
+# Built fields per serializer class, shared across requests
+_FIELDS_CACHE = {}
+# Fields that own a child field or serializer, which a shallow copy would share
+_NESTED_FIELD_TYPES = (serializers.BaseSerializer, serializers.ManyRelatedField)
+
+
+def _uploaded_file_size(value) -> int:
+    """Size of an uploaded file without reading its content.
+
+    Django's upload handlers record the size while streaming the request, so
+    `value.size` is normally set; otherwise measure by seeking to the end.
+    """
+    size = getattr(value, 'size', None)
+    if size is None:
+        position = value.tell()
+        size = value.seek(0, 2)
+        value.seek(position)
+    return size
+
+
+class CachedFieldsMixin:
+    """
+    Build a serializer class's fields once and hand each instance copies.
+
+    ModelSerializer.get_fields() introspects the model and deep-copies every
+    declared field on each instantiation. Plain fields are shallow-copied here;
+    nested serializers and many-related fields hold a child that bind() sets
+    the parent and context of, so those are deep-copied to keep the child per
+    instance. The copies are bound to the new serializer by DRF's `fields`
+    property as usual.
+    """
+
+    def get_fields(self):
+        cls = type(self)
+        fields = _FIELDS_CACHE.get(cls)
+        if fields is None:
+            fields = _FIELDS_CACHE[cls] = super().get_fields()
+        return {
+            name: copy.deepcopy(field) if isinstance(field, _NESTED_FIELD_TYPES) else copy.copy(field)
+            for name, field in fields.items()
+        }
+
+
+class DocumentRoleListSerializer(serializers.ListSerializer):
+    """Resolve the requesting user's role on every listed document with one ACL query."""
+
+    def to_representation(self, data):
+        documents = list(data.all() if isinstance(data, BaseManager) else data)
+        request = self.context.get('request')
+        if request is not None:
+            prime_effective_roles(request, documents)
+        return super().to_representation(documents)
+
+
+@functools.lru_cache(maxsize=None)
+def _url_template(view_name, kwarg, placeholder):
+    """
+    Reverse a URL once with a placeholder argument and keep it as a format string.
+
+    The script prefix is stripped before caching, since it belongs to the
+    request that happened to reverse first; callers add the current one.
+    """
+    path = reverse(view_name, kwargs={kwarg: placeholder})
+    prefix = get_script_prefix()
+    if path.startswith(prefix):
+        path = path[len(prefix):]
+    return path.replace(str(placeholder), '{}')
+
+
+def attachment_download_path(attachment_id):
+    return get_script_prefix() + _url_template('my_app:attachment_download', 'attachment_id', '00000000-0000-0000-0000-000000000000').format(attachment_id)
+
+
+def document_qr_code_path(pk):
+    return get_script_prefix() + _url_template('my_app:document_qr_code', 'pk', 987654321).format(pk)
+
+
+def _absolute_url(context, path):
+    """Absolute URL for a site-relative path; the request's scheme and host are resolved once per serializer run."""
+    base = context.get('url_base')
+    if base is None:
+        base = context['url_base'] = context['request'].build_absolute_uri('/')[:-1]
+    return base + path
+
+
+def _context_now(context):
+    """Current time, taken once per serializer run so every row is compared against the same instant."""
+    now = context.get('now')
+    if now is None:
+        now = context['now'] = timezone.now()
+    return now
+
+
+def _is_prefetched(obj, related_name):
+    """Whether obj.<related_name> was loaded by prefetch_related (e.g. Document.objects.with_related())."""
+    return related_name in getattr(obj, '_prefetched_objects_cache', {})
+
+
+def _document_attachments(obj):
+    """Attachments of a document without their file content, oldest first unless already prefetched."""
+    if _is_prefetched(obj, 'attachments'):
+        return obj.attachments.all()
+    return obj.attachments.defer('data').order_by('created_at')
+
+
+def _first_attachment(obj):
+    """Oldest attachment of a document, picked from the prefetch when available."""
+    if _is_prefetched(obj, 'attachments'):
+        return min(obj.attachments.all(), key=lambda att: att.created_at, default=None)
+    return obj.attachments.defer('data').order_by('created_at').first()
+
+
+def _document_labels(obj):
+    if _is_prefetched(obj, 'documentlabel_set'):
+        return [{'id': dl.label_id, 'name': dl.label.name} for dl in obj.documentlabel_set.all()]
+    return list(Label.objects.filter(documentlabel__document=obj).values('id', 'name'))
+
+
+def _document_collections(obj, request):
+    owner_id = request.user.id if request and request.user and request.user.is_authenticated else None
+    if _is_prefetched(obj, 'documentcollection_set'):
+        return [
+            {'id': dc.collection_id, 'name': dc.collection.name, 'parent_id': dc.collection.parent_id}
+            for dc in obj.documentcollection_set.all()
+            if owner_id is None or dc.collection.owner_id == owner_id
+        ]
+    qs = Collection.objects.filter(documentcollection__document=obj)
+    if owner_id is not None:
+        qs = qs.filter(owner_id=owner_id)
+    return list(qs.values('id', 'name', 'parent_id'))
 
 class OCRUploadSerializer(serializers.Serializer):
     """
@@ -49,7 +191,7 @@ class OCRUploadSerializer(serializers.Serializer):
             )
         
         # Validate file size
-        file_size = value.size
+        file_size = _uploaded_file_size(value)
         is_valid_size, size_error = validate_file_size(file_size)
         if not is_valid_size:
             raise serializers.ValidationError(size_error)
@@ -102,7 +244,7 @@ class OCRErrorSerializer(serializers.Serializer):
         required=False
     )
 
-class DocumentSerializer(serializers.ModelSerializer):
+class DocumentSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for Document model with QR code support.
     """
@@ -115,10 +257,11 @@ class DocumentSerializer(serializers.ModelSerializer):
     collections = serializers.SerializerMethodField()
     user_role = serializers.SerializerMethodField()
     user_permissions = serializers.SerializerMethodField()
-    owner_username = serializers.SerializerMethodField()
+    owner_username = serializers.CharField(source='owner.username', read_only=True, default='Unknown')
     
     class Meta:
         model = Document
+        list_serializer_class = DocumentRoleListSerializer
         fields = [
             'id', 'title', 'file_url', 'attachments', 'html', 'text',
             'qr_code_url', 'qr_resolve_url', 'document_url', 'labels', 'collections', 'created_at', 'updated_at',
@@ -130,33 +273,29 @@ class DocumentSerializer(serializers.ModelSerializer):
         """Get the URL for the QR code image served from database."""
         if obj.qr_code_data:
             request = self.context.get('request')
-            from django.urls import reverse
-            url = reverse('my_app:document_qr_code', kwargs={'pk': obj.pk})
+            url = document_qr_code_path(obj.pk)
             if request:
-                return request.build_absolute_uri(url)
+                return _absolute_url(self.context, url)
             return url
         return None
     
     def get_file_url(self, obj):
         """Return URL to first attachment download as original file URL."""
         request = self.context.get('request')
-        first = obj.attachments.order_by('created_at').first()
+        first = _first_attachment(obj)
         if not first or not request:
             return None
-        from django.urls import reverse
-        url = reverse('my_app:attachment_download', kwargs={'attachment_id': str(first.id)})
-        return request.build_absolute_uri(url)
+        return _absolute_url(self.context, attachment_download_path(first.id))
 
     def get_attachments(self, obj):
         request = self.context.get('request')
         items = []
-        for att in obj.attachments.all():
+        for att in _document_attachments(obj):
             url = None
             if request:
-                from django.urls import reverse
-                url = request.build_absolute_uri(reverse('my_app:attachment_download', kwargs={'attachment_id': str(att.id)}))
+                url = _absolute_url(self.context, attachment_download_path(att.id))
             items.append({
-                'id': str(att.id),
+                'id': att.id,
                 'filename': att.filename,
                 'media_type': att.media_type,
                 'created_at': att.created_at,
@@ -173,15 +312,11 @@ class DocumentSerializer(serializers.ModelSerializer):
 
     def update(self, instance, validated_data):
         html = validated_data.get('html', None)
-        if html is not None:
+        # Only re-parse when the content changed (saves that just touch the title skip it)
+        if html is not None and (html != instance.html or instance.text is None):
             instance.html = html
             # regenerate plain text from HTML
-            if BeautifulSoup:
-                instance.text = BeautifulSoup(html, 'html.parser').get_text("\n")
-            else:
-                # minimal fallback: strip tags naïvely
-                import re
-                instance.text = re.sub('<[^<]+?>', '', html)
+            instance.text = html_to_text(html)
         title = validated_data.get('title', None)
         if title is not None:
             instance.title = title
@@ -190,55 +325,34 @@ class DocumentSerializer(serializers.ModelSerializer):
         return instance
 
     def get_labels(self, obj):
-        items = Label.objects.filter(documentlabel__document=obj).values('id', 'name')
-        return list(items)
+        return _document_labels(obj)
 
     def get_collections(self, obj):
-        request = self.context.get('request')
-        qs = Collection.objects.filter(documentcollection__document=obj)
-        if request and request.user and request.user.is_authenticated:
-            qs = qs.filter(owner=request.user)
-        return list(qs.values('id', 'name', 'parent_id'))
+        return _document_collections(obj, self.context.get('request'))
 
     def get_user_role(self, obj):
         """Get the current user's role for this document."""
         request = self.context.get('request')
         if not request or not request.user or not request.user.is_authenticated:
             return None
-        
-        from .permissions import get_user_effective_role
-        return get_user_effective_role(request.user, obj)
+        return get_user_effective_role(request.user, obj, request=request)
 
     def get_user_permissions(self, obj):
         """Get the current user's permissions for this document."""
         request = self.context.get('request')
         if not request or not request.user or not request.user.is_authenticated:
             return []
-        
-        from .permissions import user_can_perform_action
-        from .models import Action
-        
-        permissions = []
-        actions = [Action.VIEW, Action.EDIT, Action.SHARE, Action.EXPORT]
-        
-        for action in actions:
-            if user_can_perform_action(request.user, obj, action):
-                permissions.append(action)
-        
-        return permissions
 
-    def get_owner_username(self, obj):
-        """Get the username of the document owner."""
-        if obj.owner:
-            return obj.owner.username
-        return 'Unknown'
+        # One role lookup (cached on the request) covers every action
+        allowed = ROLE_PERMISSIONS.get(get_user_effective_role(request.user, obj, request=request), ())
+        return [action for action in DOCUMENT_ACTIONS if action in allowed]
 
-class DocumentListSerializer(serializers.ModelSerializer):
+class DocumentListSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """
     Lighter serializer for Document list view - excludes html/text for performance.
     """
     qr_code_url = serializers.SerializerMethodField()
-    owner_username = serializers.SerializerMethodField()
+    owner_username = serializers.CharField(source='owner.username', read_only=True, default='Unknown')
     labels = serializers.SerializerMethodField()
     collections = serializers.SerializerMethodField()
     user_role = serializers.SerializerMethodField()
@@ -246,6 +360,7 @@ class DocumentListSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Document
+        list_serializer_class = DocumentRoleListSerializer
         fields = [
             'id', 'title', 'qr_code_url', 'created_at', 'updated_at',
             'owner_username', 'labels', 'collections', 'user_role', 'file_url'
@@ -254,50 +369,38 @@ class DocumentListSerializer(serializers.ModelSerializer):
 
     def get_qr_code_url(self, obj):
         """Get the URL for the QR code image served from database."""
-        if obj.qr_code_data:
+        # Querysets from Document.objects.for_listing() defer the PNG itself
+        has_qr_code = getattr(obj, 'has_qr_code', None)
+        if has_qr_code is None:
+            has_qr_code = bool(obj.qr_code_data)
+        if has_qr_code:
             request = self.context.get('request')
-            from django.urls import reverse
-            url = reverse('my_app:document_qr_code', kwargs={'pk': obj.pk})
+            url = document_qr_code_path(obj.pk)
             if request:
-                return request.build_absolute_uri(url)
+                return _absolute_url(self.context, url)
             return url
         return None
 
-    def get_owner_username(self, obj):
-        """Get the username of the document owner."""
-        if obj.owner:
-            return obj.owner.username
-        return 'Unknown'
-
     def get_labels(self, obj):
-        items = Label.objects.filter(documentlabel__document=obj).values('id', 'name')
-        return list(items)
+        return _document_labels(obj)
 
     def get_collections(self, obj):
-        request = self.context.get('request')
-        qs = Collection.objects.filter(documentcollection__document=obj)
-        if request and request.user and request.user.is_authenticated:
-            qs = qs.filter(owner=request.user)
-        return list(qs.values('id', 'name', 'parent_id'))
+        return _document_collections(obj, self.context.get('request'))
 
     def get_user_role(self, obj):
         """Get the current user's role for this document."""
         request = self.context.get('request')
         if not request or not request.user or not request.user.is_authenticated:
             return None
-        
-        from .permissions import get_user_effective_role
-        return get_user_effective_role(request.user, obj)
+        return get_user_effective_role(request.user, obj, request=request)
 
     def get_file_url(self, obj):
         """Get the download URL for the first attachment (original file)."""
         request = self.context.get('request')
-        first = obj.attachments.order_by('created_at').first()
+        first = _first_attachment(obj)
         if not first or not request:
             return None
-        from django.urls import reverse
-        url = reverse('my_app:attachment_download', kwargs={'attachment_id': str(first.id)})
-        return request.build_absolute_uri(url)
+        return _absolute_url(self.context, attachment_download_path(first.id))
 
 
 class DocumentCreateSerializer(serializers.ModelSerializer):
@@ -330,7 +433,7 @@ class DocumentCreateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("File must have a valid filename.")
         
         # Validate file size
-        file_size = value.size
+        file_size = _uploaded_file_size(value)
         is_valid_size, size_error = validate_file_size(file_size)
         if not is_valid_size:
             raise serializers.ValidationError(size_error)
@@ -344,13 +447,7 @@ class DocumentCreateSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         request = self.context.get('request')
         html = validated_data.get('html', '')
-        if html and BeautifulSoup:
-            text = BeautifulSoup(html, 'html.parser').get_text("\n")
-        elif html:
-            import re
-            text = re.sub('<[^<]+?>', '', html)
-        else:
-            text = ''
+        text = html_to_text(html)
         document = Document.objects.create(
             title=validated_data.get('title'),
             html=html or None,
@@ -387,6 +484,10 @@ class GroupSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
     
     def get_member_count(self, obj):
+        # List views annotate member_count_agg; single groups fall back to COUNT
+        member_count = getattr(obj, 'member_count_agg', None)
+        if member_count is not None:
+            return member_count
         return obj.user_set.count()
 
 
@@ -409,7 +510,7 @@ class GroupMembershipSerializer(serializers.Serializer):
 
 
 # ShareLink Serializers
-class ShareLinkSerializer(serializers.ModelSerializer):
+class ShareLinkSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     document_title = serializers.CharField(source='document.title', read_only=True)
     created_by_email = serializers.CharField(source='created_by.email', read_only=True)
     is_expired = serializers.SerializerMethodField()
@@ -427,8 +528,7 @@ class ShareLinkSerializer(serializers.ModelSerializer):
     def get_is_expired(self, obj):
         if not obj.expires_at:
             return False
-        from django.utils import timezone
-        return obj.expires_at < timezone.now()
+        return obj.expires_at < _context_now(self.context)
     
     def get_is_revoked(self, obj):
         return obj.revoked_at is not None
@@ -451,8 +551,35 @@ class ShareLinkCreateSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+def build_acl_subject_map(acls):
+    """
+    Load the users, groups and share links referenced by ACL rows, one query per type.
+
+    Returns {'user': {...}, 'group': {...}, 'share_link': {...}} keyed by subject_id.
+    """
+    import uuid
+    from django.contrib.auth import get_user_model
+    User = get_user_model()
+
+    user_ids = {acl.subject_user_id for acl in acls if acl.subject_user_id}
+    group_ids = {acl.subject_group_id for acl in acls if acl.subject_group_id}
+    share_link_ids = set()
+    for acl in acls:
+        if acl.subject_type == 'share_link':
+            try:
+                share_link_ids.add(uuid.UUID(acl.subject_id))
+            except ValueError:
+                pass
+
+    return {
+        'user': {str(pk): user for pk, user in User.objects.in_bulk(user_ids).items()} if user_ids else {},
+        'group': {str(pk): group for pk, group in Group.objects.in_bulk(group_ids).items()} if group_ids else {},
+        'share_link': {str(pk): link for pk, link in ShareLink.objects.in_bulk(share_link_ids).items()} if share_link_ids else {},
+    }
+
+
 # Enhanced ACL Serializer
-class ACLSerializer(serializers.ModelSerializer):
+class ACLSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     subject_display_name = serializers.SerializerMethodField()
     created_by_email = serializers.CharField(source='created_by.email', read_only=True)
     is_expired = serializers.SerializerMethodField()
@@ -467,33 +594,23 @@ class ACLSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_by', 'created_at']
     
     def get_subject_display_name(self, obj):
+        # List views pass a subject_map built once for all rows
+        subject_map = self.context.get('subject_map')
+        if subject_map is None:
+            subject_map = build_acl_subject_map([obj])
+        subject = subject_map.get(obj.subject_type, {}).get(obj.subject_id)
         if obj.subject_type == 'user':
-            try:
-                from django.contrib.auth import get_user_model
-                User = get_user_model()
-                user = User.objects.get(id=obj.subject_id)
-                return user.email or user.username
-            except:
-                return f"User #{obj.subject_id}"
+            return (subject.email or subject.username) if subject else f"User #{obj.subject_id}"
         elif obj.subject_type == 'group':
-            try:
-                group = Group.objects.get(id=obj.subject_id)
-                return group.name
-            except:
-                return f"Group #{obj.subject_id}"
+            return subject.name if subject else f"Group #{obj.subject_id}"
         elif obj.subject_type == 'share_link':
-            try:
-                share_link = ShareLink.objects.get(id=obj.subject_id)
-                return f"Share Link ({share_link.role})"
-            except:
-                return f"Share Link #{obj.subject_id}"
+            return f"Share Link ({subject.role})" if subject else f"Share Link #{obj.subject_id}"
         return obj.subject_id
     
     def get_is_expired(self, obj):
         if not obj.expires_at:
             return False
-        from django.utils import timezone
-        return obj.expires_at < timezone.now()
+        return obj.expires_at < _context_now(self.context)
 
 
 class DocumentVersionSerializer(serializers.ModelSerializer):
@@ -527,12 +644,16 @@ class DocumentVersionListSerializer(serializers.ModelSerializer):
     
     def get_content_preview(self, obj):
         """Return a preview of the content (first 200 chars of text)."""
-        if obj.text:
-            return obj.text[:200] + ('...' if len(obj.text) > 200 else '')
-        return None
+        # Views annotate `text_preview` (one char past the limit) to avoid loading full text
+        text = obj.text_preview if hasattr(obj, 'text_preview') else obj.text
+        if not text:
+            return None
+        if len(text) > CONTENT_PREVIEW_LENGTH:
+            return text[:CONTENT_PREVIEW_LENGTH] + '...'
+        return text
 
 
-class AuditLogSerializer(serializers.ModelSerializer):
+class AuditLogSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for audit log entries."""
     actor_name = serializers.CharField(source='actor_user.username', read_only=True)
     actor_email = serializers.CharField(source='actor_user.email', read_only=True)
@@ -1,3 +1,356 @@
-from django.test import TestCase
+import datetime
+import decimal
+import io
+import time
+import unittest
+import uuid
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from .audit import _write_audit_entry
+from .models import ACL, Action, Attachment, AuditLog, Document, DocumentLabel, Label, QRLink, Role
+from .permissions import get_effective_roles_bulk, get_user_effective_role, prime_effective_roles
+from .utils import html_text
+
+
+class GroupAclRoleTests(TestCase):
+    """Effective roles granted through a group ACL (regression: get_user_group_ids recursed forever)."""
+
+    def setUp(self):
+        User = get_user_model()
+        self.owner = User.objects.create_user(username='owner', password='x')
+        self.member = User.objects.create_user(username='member', password='x')
+        self.group = Group.objects.create(name='editors')
+        self.member.groups.add(self.group)
+        self.document = Document.objects.create(title='Shared', owner=self.owner)
+        ACL.objects.create(document=self.document, subject_type='group', subject_group=self.group, role=Role.EDITOR)
+
+    def test_effective_role_through_group_acl(self):
+        self.assertEqual(get_user_effective_role(self.member, self.document), Role.EDITOR)
+
+    def test_bulk_roles_through_group_acl(self):
+        self.assertEqual(get_effective_roles_bulk(self.member, [self.document]), {self.document.pk: Role.EDITOR})
+
+    def test_typed_subject_mirrored_to_subject_id(self):
+        acl = ACL.objects.get(document=self.document, subject_group=self.group)
+        self.assertEqual(acl.subject_id, str(self.group.id))
+
+    def test_non_numeric_subject_id_is_rejected(self):
+        acl = ACL(document=self.document, subject_type='user', subject_id='alice', role=Role.VIEWER)
+        with self.assertRaises(ValidationError):
+            acl.save()
+
+
+class PrimaryQrCodeTests(TestCase):
+    """Document.primary_qr_code must follow QR links changed outside QRLink.save()."""
+
+    def setUp(self):
+        self.document = Document.objects.create(title='Scanned')
+        self.link = QRLink.objects.create(document=self.document, code='primary-code')
+
+    def assertResolvesTo(self, fragment):
+        self.document.refresh_from_db()
+        self.assertIn(fragment, self.document.get_qr_code_resolve_url())
+
+    def test_saved_link_is_primary(self):
+        self.assertResolvesTo('/api/qr/resolve/primary-code/')
+
+    def test_deactivated_link_falls_back(self):
+        QRLink.objects.filter(pk=self.link.pk).update(active=False)
+        self.assertResolvesTo(f'/api/documents/{self.document.pk}/')
+
+    def test_deleted_link_falls_back(self):
+        self.link.delete()
+        self.assertResolvesTo(f'/api/documents/{self.document.pk}/')
+
+
+try:  # serializers and views import the OCR stack (EasyOCR, torch, OpenCV)
+    from .serializers import CachedFieldsMixin, DocumentListSerializer
+    from .utils import ocr
+except ImportError:
+    ocr = None
+
+try:
+    from .renderers import ORJSONRenderer
+except ImportError:  # drf-orjson-renderer not installed
+    ORJSONRenderer = None
+
+
+@unittest.skipIf(ORJSONRenderer is None, 'drf-orjson-renderer is not installed')
+class ORJSONRendererTests(TestCase):
+    """The orjson renderer must produce the same bytes as DRF's JSONRenderer for API data."""
+
+    data = {
+        'ts': datetime.datetime(2024, 1, 2, 3, 4, 5, 123456, tzinfo=datetime.timezone.utc),
+        'day': datetime.date(2024, 1, 2),
+        'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'amount': decimal.Decimal('1.50'),
+        'elapsed': datetime.timedelta(seconds=90),
+        'title': 'Caf\u00e9',
+        'separators': 'a\u2028b\u2029c',
+        'by_id': {1: 'x'},
+    }
+
+    def test_datetime_format_is_pinned(self):
+        self.assertIn(b'"ts":"2024-01-02T03:04:05.123456Z"', ORJSONRenderer().render(self.data))
+
+    def test_matches_drf_json_renderer(self):
+        self.assertEqual(ORJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+
+    def test_integers_wider_than_64_bits_fall_back(self):
+        data = {'big': 2 ** 70}
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+@mock.patch.object(html_text, 'lxml_html', None)
+@mock.patch.object(html_text, 'BeautifulSoup', None)
+class HtmlToTextFallbackTests(SimpleTestCase):
+    """The regex fallback must stay linear on runs of '<' and unterminated comments."""
+
+    def assertFast(self, html):
+        start = time.perf_counter()
+        html_text.html_to_text(html)
+        self.assertLess(time.perf_counter() - start, 0.25)
+
+    def test_strips_tags_and_comments(self):
+        self.assertEqual(html_text.html_to_text('<p>a<!-- <b>x</b> -->b</p>'), 'ab')
+
+    def test_long_run_of_open_brackets(self):
+        self.assertFast('<' * 50000)
+
+    def test_long_run_of_unterminated_comments(self):
+        self.assertFast('<!--' * 50000)
+
+
+class AuditWriterTests(TransactionTestCase):
+    """Rows written after their document was deleted keep the event with a null reference."""
+
+    def test_deleted_document_is_nulled_instead_of_dropping_the_row(self):
+        owner = get_user_model().objects.create_user(username='owner', password='x')
+        document = Document.objects.create(title='Gone', owner=owner)
+        payload = {
+            'ts': datetime.datetime.now(datetime.timezone.utc),
+            'actor_user_id': owner.pk,
+            'action': Action.VIEW,
+            'document_id': document.pk,
+            'version_no': None,
+            'ip': None,
+            'user_agent': '',
+            'context': {},
+            'share_link_id': None,
+            'qr_link_id': None,
+        }
+        document.delete()
+        _write_audit_entry(payload)
+        entry = AuditLog.objects.get()
+        self.assertIsNone(entry.document_id)
+        self.assertEqual(entry.actor_user_id, owner.pk)
+
+
+def _auditlog_is_partitioned():
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass('my_app_auditlog_default')")
+        return cursor.fetchone()[0] is not None
+
+
+class AuditLogPartitionCommandTests(TestCase):
+    """create_auditlog_partitions must take over rows that already landed in the DEFAULT partition."""
+
+    def setUp(self):
+        if not _auditlog_is_partitioned():
+            self.skipTest('my_app_auditlog is not partitioned (needs PostgreSQL and migration 0021)')
+
+    def test_moves_default_partition_rows_into_new_month(self):
+        # Six months out is past the partitions migration 0021 creates
+        today = datetime.date.today()
+        year, month = divmod(today.month - 1 + 6, 12)
+        start = datetime.date(today.year + year, month + 1, 1)
+        ts = datetime.datetime.combine(start, datetime.time(12), tzinfo=datetime.timezone.utc)
+        entry = AuditLog.objects.create(action=Action.VIEW, ts=ts)
+
+        call_command('create_auditlog_partitions', months=6, stdout=io.StringIO())
+
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT count(*) FROM my_app_auditlog_default')
+            self.assertEqual(cursor.fetchone()[0], 0)
+            cursor.execute(f'SELECT id FROM "my_app_auditlog_{start:%Y_%m}"')
+            self.assertEqual([str(row[0]) for row in cursor.fetchall()], [str(entry.pk)])
+        self.assertTrue(AuditLog.objects.filter(pk=entry.pk).exists())
+
+
+@unittest.skipIf(ocr is None, 'the OCR stack (EasyOCR, torch, OpenCV) is not installed')
+class CachedFieldsMixinTests(TestCase):
+    """Fields built once per serializer class must not carry state from one instance to the next."""
+
+    def setUp(self):
+        User = get_user_model()
+        self.owner = User.objects.create_user(username='owner', password='x')
+        self.viewer = User.objects.create_user(username='viewer', password='x')
+        self.document = Document.objects.create(title='Shared', owner=self.owner)
+        ACL.objects.create(document=self.document, subject_type='user', subject_user=self.viewer, role=Role.VIEWER)
+
+    def _request(self, user):
+        request = RequestFactory().get('/')
+        request.user = user
+        return request
+
+    def test_fields_are_bound_to_their_own_serializer(self):
+        class UserGroupsSerializer(CachedFieldsMixin, serializers.ModelSerializer):
+            class Meta:
+                model = get_user_model()
+                fields = ['id', 'username', 'groups']
+
+        first = UserGroupsSerializer(self.owner)
+        second = UserGroupsSerializer(self.viewer)
+        for name in ('username', 'groups'):
+            self.assertIsNot(first.fields[name], second.fields[name])
+            self.assertIs(first.fields[name].parent, first)
+            self.assertIs(second.fields[name].parent, second)
+        # The many-related field's child is deep-copied, not shared
+        self.assertIsNot(first.fields['groups'].child_relation, second.fields['groups'].child_relation)
+        self.assertIs(second.fields['groups'].child_relation.root, second)
+
+    def test_context_does_not_leak_between_instances(self):
+        owner_data = DocumentListSerializer(self.document, context={'request': self._request(self.owner)}).data
+        viewer_data = DocumentListSerializer(self.document, context={'request': self._request(self.viewer)}).data
+        self.assertEqual(owner_data['user_role'], Role.OWNER)
+        self.assertEqual(viewer_data['user_role'], Role.VIEWER)
+
+
+class RequestRoleCacheTests(TestCase):
+    """Roles are memoized per request, so a new request sees ACL changes."""
+
+    def setUp(self):
+        User = get_user_model()
+        self.owner = User.objects.create_user(username='owner', password='x')
+        self.member = User.objects.create_user(username='member', password='x')
+        self.document = Document.objects.create(title='Shared', owner=self.owner)
+        self.acl = ACL.objects.create(document=self.document, subject_type='user', subject_user=self.member, role=Role.VIEWER)
+
+    def _request(self):
+        request = RequestFactory().get('/')
+        request.user = self.member
+        return request
+
+    def test_role_is_memoized_within_a_request(self):
+        request = self._request()
+        self.assertEqual(get_user_effective_role(self.member, self.document, request=request), Role.VIEWER)
+        ACL.objects.filter(pk=self.acl.pk).update(role=Role.EDITOR)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_user_effective_role(self.member, self.document, request=request), Role.VIEWER)
+
+    def test_new_request_sees_acl_changes(self):
+        self.assertEqual(get_user_effective_role(self.member, self.document, request=self._request()), Role.VIEWER)
+        ACL.objects.filter(pk=self.acl.pk).update(role=Role.EDITOR)
+        self.assertEqual(get_user_effective_role(self.member, self.document, request=self._request()), Role.EDITOR)
+
+    def test_primed_roles_are_served_from_the_request(self):
+        request = self._request()
+        prime_effective_roles(request, [self.document])
+        with self.assertNumQueries(0):
+            self.assertEqual(get_user_effective_role(self.member, self.document, request=request), Role.VIEWER)
+
+
+@unittest.skipIf(ocr is None, 'the OCR stack (EasyOCR, torch, OpenCV) is not installed')
+class DocumentListQueryCountTests(TestCase):
+    """List endpoints run a fixed number of queries however many documents they return."""
+
+    def setUp(self):
+        User = get_user_model()
+        self.owner = User.objects.create_user(username='owner', password='x')
+        self.member = User.objects.create_user(username='member', password='x')
+        self.label = Label.objects.create(name='invoices')
+        self.client = APIClient()
+        self._add_documents(2)
+
+    def _add_documents(self, count):
+        for i in range(count):
+            owner = self.member if i % 2 else self.owner
+            document = Document.objects.create(title=f'Report {Document.objects.count()}', owner=owner)
+            if owner is self.owner:
+                ACL.objects.create(document=document, subject_type='user', subject_user=self.member, role=Role.VIEWER)
+            DocumentLabel.objects.create(document=document, label=self.label)
+            Attachment.objects.create(document=document, media_type='application/pdf', filename='report.pdf', data=b'%PDF', metadata={})
+
+    def _query_count(self, url):
+        # A fresh user per request, as in production: the user object caches its group ids
+        self.client.force_authenticate(get_user_model().objects.get(pk=self.member.pk))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def assertQueryCountIndependentOfSize(self, url):
+        few = self._query_count(url)
+        self._add_documents(6)
+        self.assertEqual(self._query_count(url), few)
+
+    def test_document_list(self):
+        self.assertQueryCountIndependentOfSize(reverse('my_app:document_list_create'))
+
+    def test_standard_search(self):
+        self.assertQueryCountIndependentOfSize(reverse('my_app:search_standard') + '?q=Report')
+
+
+@unittest.skipIf(ocr is None, 'the OCR stack (EasyOCR, torch, OpenCV) is not installed')
+class OcrLayoutTests(SimpleTestCase):
+    """Line grouping matches the baseline per-block implementation on a fixed EasyOCR result."""
+
+    # (bbox, text, confidence) as returned by reader.readtext, deliberately out of order;
+    # 'noise' is below the confidence cut-off and 'drifts' joins its line by the line's mean y
+    RESULTS = [
+        ([[300, 12], [380, 12], [380, 40], [300, 40]], ' World ', 0.91),
+        ([[10, 10], [120, 10], [120, 42], [10, 42]], 'Hello', 0.87),
+        ([[140, 18], [260, 18], [260, 50], [140, 50]], 'there,', 0.62),
+        ([[12, 80], [200, 80], [200, 110], [12, 110]], 'Second line', 0.95),
+        ([[220, 95], [330, 95], [330, 128], [220, 128]], 'drifts', 0.55),
+        ([[400, 60], [480, 60], [480, 90], [400, 90]], 'noise', 0.2),
+        ([[15, 160], [90, 160], [90, 190], [15, 190]], 'Total:', 0.78),
+        ([[350, 158], [420, 158], [420, 192], [350, 192]], '42', 0.99),
+        ([[100, 200], [180, 200], [180, 232], [100, 232]], 'EUR', 0.44),
+    ]
+
+    def test_text_and_lines_match_baseline(self):
+        result, success = ocr._positions_from_ocr_results(self.RESULTS, 500, 300)
+        self.assertTrue(success)
+        self.assertEqual(result['text'], 'Hello there, World\nSecond line drifts\nTotal: 42\nEUR')
+        self.assertEqual(result['total_blocks'], 8)
+        self.assertEqual(result['total_lines'], 4)
+        self.assertAlmostEqual(result['confidence'], 0.76375)
+        self.assertEqual(
+            [(line['line_number'], line['text'], line['bbox'], [block['text'] for block in line['blocks']]) for line in result['lines']],
+            [
+                (1, 'Hello there, World', {'min_x': 10, 'min_y': 10, 'max_x': 380, 'max_y': 50}, ['Hello', 'there,', 'World']),
+                (2, 'Second line drifts', {'min_x': 12, 'min_y': 80, 'max_x': 330, 'max_y': 128}, ['Second line', 'drifts']),
+                (3, 'Total: 42', {'min_x': 15, 'min_y': 158, 'max_x': 420, 'max_y': 192}, ['Total:', '42']),
+                (4, 'EUR', {'min_x': 100, 'min_y': 200, 'max_x': 180, 'max_y': 232}, ['EUR']),
+            ],
+        )
+        for line, expected in zip(result['lines'], (0.8, 0.75, 0.885, 0.44)):
+            self.assertAlmostEqual(line['confidence'], expected)
+
+    def test_blocks_match_baseline(self):
+        result, _ = ocr._positions_from_ocr_results(self.RESULTS, 500, 300)
+        self.assertEqual(
+            [block['text'] for block in result['blocks']],
+            ['Hello', 'World', 'there,', 'Second line', 'drifts', 'Total:', '42', 'EUR'],
+        )
+        self.assertEqual(result['blocks'][0], {
+            'text': 'Hello',
+            'confidence': 0.87,
+            'position': {'x': 65.0, 'y': 26.0, 'width': 110, 'height': 32},
+            'bbox': {'top_left': [10, 10], 'top_right': [120, 10], 'bottom_right': [120, 42], 'bottom_left': [10, 42]},
+        })
@@ -2,16 +2,47 @@
 URL configuration for my_app OCR and Document management endpoints.
 """
 
-from django.urls import path
+from django.urls import include, path
 from . import views
 
 app_name = 'my_app'
 
+# Endpoint groups sharing a prefix are included as sub-lists so the resolver
+# only scans a group's patterns once its prefix matches (names stay in 'my_app').
+ocr_urlpatterns = [
+    path('extract/', views.ocr_extract_text, name='ocr_extract_text'),
+    path('extract-detailed/', views.ocr_extract_detailed, name='ocr_extract_detailed'),
+    path('info/', views.ocr_info, name='ocr_info'),
+]
+
+auth_urlpatterns = [
+    path('register/', views.register, name='auth_register'),
+    path('me/', views.me, name='auth_me'),
+    path('login/', views.login_view, name='auth_login'),
+    path('logout/', views.logout_view, name='auth_logout'),
+    path('users/', views.list_users, name='auth_users'),
+    path('profile/', views.user_profile, name='auth_profile'),
+    path('change-password/', views.change_password, name='auth_change_password'),
+    path('avatar/', views.upload_avatar, name='auth_avatar'),
+    path('verify-email/', views.verify_email, name='auth_verify_email'),
+    path('resend-verification/', views.resend_verification, name='auth_resend_verification'),
+]
+
+admin_urlpatterns = [
+    path('users/', views.admin_users_list, name='admin_users_list'),
+    path('users/<int:user_id>/approve/', views.admin_user_approve, name='admin_user_approve'),
+    path('users/<int:user_id>/reject/', views.admin_user_reject, name='admin_user_reject'),
+    path('users/<int:user_id>/delete/', views.admin_user_delete, name='admin_user_delete'),
+    path('users/<int:user_id>/resend-verification/', views.admin_user_resend_verification, name='admin_user_resend_verification'),
+    path('acl/', views.admin_acl_list, name='admin_acl_list'),
+    path('acl/<uuid:acl_id>/', views.admin_acl_detail, name='admin_acl_detail'),
+    path('dashboard/stats/', views.admin_dashboard_stats, name='admin_dashboard_stats'),
+    path('groups/', views.admin_groups_list, name='admin_groups_list'),
+]
+
 urlpatterns = [
     # OCR endpoints
-    path('ocr/extract/', views.ocr_extract_text, name='ocr_extract_text'),
-    path('ocr/extract-detailed/', views.ocr_extract_detailed, name='ocr_extract_detailed'),
-    path('ocr/info/', views.ocr_info, name='ocr_info'),
+    path('ocr/', include(ocr_urlpatterns)),
     
     # Document management endpoints
     path('documents/', views.DocumentListCreateView.as_view(), name='document_list_create'),
@@ -23,16 +54,7 @@ urlpatterns = [
     path('qr/resolve/<str:code>/', views.resolve_qr, name='qr_resolve'),
 
     # Auth endpoints
-    path('auth/register/', views.register, name='auth_register'),
-    path('auth/me/', views.me, name='auth_me'),
-    path('auth/login/', views.login_view, name='auth_login'),
-    path('auth/logout/', views.logout_view, name='auth_logout'),
-    path('auth/users/', views.list_users, name='auth_users'),
-    path('auth/profile/', views.user_profile, name='auth_profile'),
-    path('auth/change-password/', views.change_password, name='auth_change_password'),
-    path('auth/avatar/', views.upload_avatar, name='auth_avatar'),
-    path('auth/verify-email/', views.verify_email, name='auth_verify_email'),
-    path('auth/resend-verification/', views.resend_verification, name='auth_resend_verification'),
+    path('auth/', include(auth_urlpatterns)),
 
     # Sharing & ACL
     path('documents/<int:pk>/share/', views.document_share_create, name='document_share_create'),
@@ -96,13 +118,5 @@ urlpatterns = [
     path('documents/<int:document_id>/restore/', views.document_restore_version, name='document_restore_version'),
 
     # Admin
-    path('admin/users/', views.admin_users_list, name='admin_users_list'),
-    path('admin/users/<int:user_id>/approve/', views.admin_user_approve, name='admin_user_approve'),
-    path('admin/users/<int:user_id>/reject/', views.admin_user_reject, name='admin_user_reject'),
-    path('admin/users/<int:user_id>/delete/', views.admin_user_delete, name='admin_user_delete'),
-    path('admin/users/<int:user_id>/resend-verification/', views.admin_user_resend_verification, name='admin_user_resend_verification'),
-    path('admin/acl/', views.admin_acl_list, name='admin_acl_list'),
-    path('admin/acl/<uuid:acl_id>/', views.admin_acl_detail, name='admin_acl_detail'),
-    path('admin/dashboard/stats/', views.admin_dashboard_stats, name='admin_dashboard_stats'),
-    path('admin/groups/', views.admin_groups_list, name='admin_groups_list'),
+    path('admin/', include(admin_urlpatterns)),
 ] 
\ No newline at end of file
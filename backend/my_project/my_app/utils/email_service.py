@@ -1,57 +1,158 @@
-import random
 import logging
+import secrets
+import atexit
+import queue
+import threading
+import time
+from types import SimpleNamespace
 from django.conf import settings
+from django.template.loader import render_to_string
+
+try:
+    import sib_api_v3_sdk
+    from sib_api_v3_sdk.rest import ApiException
+except ImportError:  # Brevo SDK not installed: emails are skipped
+    sib_api_v3_sdk = None
+    ApiException = Exception
 
 logger = logging.getLogger(__name__)
 
+# Verification emails are sent by a background thread so that signup and
+# resend requests do not wait on the Brevo HTTPS round-trip.
+_email_queue = queue.Queue()
+_email_worker = None
+_email_worker_lock = threading.Lock()
+
+# Brevo API client and sender, built on first send and reused so the client's
+# connection pool keeps the HTTPS connection alive between emails
+_brevo = None
+_brevo_lock = threading.Lock()
+
+# Attempts per email when Brevo fails the call with a 5xx or 429; waits double each time
+EMAIL_SEND_MAX_ATTEMPTS = 3
+EMAIL_SEND_RETRY_DELAY = 1
+
 
 def generate_verification_code():
-    return str(random.randint(100000, 999999))
+    return f'{secrets.randbelow(900000) + 100000:06d}'
 
 
-def send_verification_email(user, code):
-    api_key = getattr(settings, 'BREVO_API_KEY', '')
-    if not api_key:
-        logger.warning('BREVO_API_KEY not configured, skipping email send')
-        return False
+def _get_brevo():
+    """Return the shared TransactionalEmailsApi and sender, reading the Brevo settings on first use."""
+    global _brevo
+    if _brevo is None:
+        with _brevo_lock:
+            if _brevo is None:
+                configuration = sib_api_v3_sdk.Configuration()
+                configuration.api_key['api-key'] = getattr(settings, 'BREVO_API_KEY', '')
+                _brevo = SimpleNamespace(
+                    api=sib_api_v3_sdk.TransactionalEmailsApi(sib_api_v3_sdk.ApiClient(configuration)),
+                    sender={
+                        'name': getattr(settings, 'BREVO_SENDER_NAME', 'Stage Perf'),
+                        'email': getattr(settings, 'BREVO_SENDER_EMAIL', 'noreply@stage-perf.com'),
+                    },
+                )
+    return _brevo
 
-    try:
-        import sib_api_v3_sdk
-        from sib_api_v3_sdk.rest import ApiException
 
-        configuration = sib_api_v3_sdk.Configuration()
-        configuration.api_key['api-key'] = api_key
-        api_instance = sib_api_v3_sdk.TransactionalEmailsApi(sib_api_v3_sdk.ApiClient(configuration))
+def _is_retryable(error):
+    """Whether a Brevo ApiException may succeed on retry: server errors, rate limiting, or no response at all."""
+    status = getattr(error, 'status', None)
+    return not status or status == 429 or status >= 500
+
 
-        sender = {
-            'name': getattr(settings, 'BREVO_SENDER_NAME', 'Stage Perf'),
-            'email': getattr(settings, 'BREVO_SENDER_EMAIL', 'noreply@stage-perf.com'),
-        }
+def _deliver_verification_email(email, username, code):
+    """Send one verification email through Brevo, retrying transient API errors with backoff."""
+    try:
+        brevo = _get_brevo()
 
         send_smtp_email = sib_api_v3_sdk.SendSmtpEmail(
-            to=[{'email': user.email, 'name': user.username}],
-            sender=sender,
+            to=[{'email': email, 'name': username}],
+            sender=brevo.sender,
             subject='Verify your email - Stage Perf',
-            html_content=f'''
-            <html>
-            <body style="font-family: Arial, sans-serif; padding: 20px;">
-                <h2>Email Verification</h2>
-                <p>Hello {user.username},</p>
-                <p>Your verification code is:</p>
-                <div style="background: #f0f0f0; padding: 20px; text-align: center; font-size: 32px; letter-spacing: 8px; font-weight: bold; border-radius: 8px; margin: 20px 0;">
-                    {code}
-                </div>
-                <p>This code expires in 15 minutes.</p>
-                <p>If you did not create an account, please ignore this email.</p>
-            </body>
-            </html>
-            ''',
+            html_content=render_to_string('email/verification.html', {'username': username, 'code': code}),
         )
 
-        api_instance.send_transac_email(send_smtp_email)
-        logger.info(f'Verification email sent to {user.email}')
+        for attempt in range(1, EMAIL_SEND_MAX_ATTEMPTS + 1):
+            try:
+                brevo.api.send_transac_email(send_smtp_email)
+                break
+            except ApiException as e:
+                # 4xx (bad address, bad key, bad payload) will fail the same way again
+                if attempt == EMAIL_SEND_MAX_ATTEMPTS or not _is_retryable(e):
+                    raise
+                logger.warning(f'Brevo send to {email} failed (attempt {attempt}), retrying: {e}')
+                time.sleep(EMAIL_SEND_RETRY_DELAY * 2 ** (attempt - 1))
+
+        logger.info(f'Verification email sent to {email}')
         return True
 
     except Exception as e:
-        logger.error(f'Failed to send verification email to {user.email}: {e}')
+        logger.error(f'Failed to send verification email to {email}: {e}')
+        return False
+
+
+def _email_worker_loop():
+    """Send queued verification emails one at a time."""
+    while True:
+        payload = _email_queue.get()
+        try:
+            _deliver_verification_email(**payload)
+        finally:
+            _email_queue.task_done()
+
+
+def _flush_email_queue():
+    """Send whatever is still queued (called at interpreter shutdown)."""
+    while True:
+        try:
+            payload = _email_queue.get_nowait()
+        except queue.Empty:
+            return
+        _deliver_verification_email(**payload)
+        _email_queue.task_done()
+
+
+def _ensure_email_worker():
+    global _email_worker
+    if _email_worker is not None and _email_worker.is_alive():
+        return
+    with _email_worker_lock:
+        if _email_worker is None or not _email_worker.is_alive():
+            _email_worker = threading.Thread(target=_email_worker_loop, name='verification-email-sender', daemon=True)
+            _email_worker.start()
+
+
+atexit.register(_flush_email_queue)
+
+
+def send_verification_email(user, code):
+    """
+    Send the verification code to the user's email address.
+
+    The email is queued for the background sender unless EMAIL_SEND_ASYNC is
+    disabled, in which case it is sent before returning.
+
+    Returns True once the email is queued (or, when sending synchronously,
+    sent), so a True result does not mean it was delivered: a queued email
+    that fails after its retries is only logged by the sender thread, and the
+    user has to ask for a new code. Returns False when Brevo is not configured
+    or a synchronous send failed.
+    """
+    api_key = getattr(settings, 'BREVO_API_KEY', '')
+    if not api_key:
+        logger.warning('BREVO_API_KEY not configured, skipping email send')
         return False
+    if sib_api_v3_sdk is None:
+        logger.warning('sib_api_v3_sdk not installed, skipping email send')
+        return False
+
+    # Copy what the email needs so the payload holds no model instance
+    payload = {'email': user.email, 'username': user.username, 'code': code}
+
+    if getattr(settings, 'EMAIL_SEND_ASYNC', True):
+        _ensure_email_worker()
+        _email_queue.put(payload)
+        logger.info(f'Verification email to {user.email} queued')
+        return True
+    return _deliver_verification_email(**payload)
@@ -0,0 +1,47 @@
+"""
+HTML to plain text conversion used to fill Document.text for search indexing.
+"""
+
+import re
+import logging
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except Exception:  # Fallback if lxml isn't available in non-venv runs
+    etree = None
+    lxml_html = None
+
+try:
+    from bs4 import BeautifulSoup
+except Exception:
+    BeautifulSoup = None
+
+logger = logging.getLogger(__name__)
+
+# Minimal fallback when no HTML parser is installed: strip comments and tags.
+# A tag stops at the next '<' and an unterminated comment runs to the end of
+# the input, so no match ever rescans text past a later '<'.
+_TAG_RE = re.compile(r'<!--.*?(?:-->|\Z)|<[^<>]*>', re.DOTALL)
+
+
+def html_to_text(html):
+    """
+    Extract the text of an HTML fragment, one text node per line.
+
+    Matches BeautifulSoup's get_text("\\n") output (comments, scripts and
+    styles are left out) but parses with lxml, which is much faster than
+    bs4's pure-Python 'html.parser'.
+    """
+    if not html or not html.strip():
+        return ''
+    if lxml_html is not None:
+        try:
+            root = lxml_html.fromstring(html)
+            etree.strip_elements(root, etree.Comment, 'script', 'style', with_tail=False)
+            return "\n".join(root.itertext())
+        except Exception as e:
+            logger.warning(f"lxml could not parse HTML, falling back: {e}")
+    if BeautifulSoup:
+        return BeautifulSoup(html, 'html.parser').get_text("\n")
+    return _TAG_RE.sub('', html)
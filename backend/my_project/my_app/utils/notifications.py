@@ -1,11 +1,29 @@
+import atexit
 import logging
+import queue
+import threading
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.db import close_old_connections, connection, transaction
 from ..models import Notification, NotificationType, ACL
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
+# Rows per INSERT when fanning a notification out to many recipients
+NOTIFICATION_BATCH_SIZE = 500
+
+# Cache key and lifetime (seconds) of the superuser ids admin notices go to
+ADMIN_IDS_CACHE_KEY = 'notify:admin_ids'
+ADMIN_IDS_CACHE_TIMEOUT = 60
+
+# Notifications to every admin are written by a background thread so that
+# signup and verification requests do not wait on the fan-out INSERT.
+_admin_notice_queue = queue.Queue()
+_admin_notice_worker = None
+_admin_notice_worker_lock = threading.Lock()
+
 
 def create_notification(recipient, notification_type, title, message, document=None, actor=None):
     try:
@@ -22,8 +40,43 @@ def create_notification(recipient, notification_type, title, message, document=N
         return None
 
 
+# Columns written by the raw INSERT path, in the order rows are built
+_NOTIFICATION_COLUMNS = ('id', 'recipient_id', 'notification_type', 'title', 'message', 'document_id', 'actor_id', 'read')
+
+
+def _insert_notifications_postgres(notifications):
+    """Insert notification rows straight through psycopg2, skipping the ORM's per-object work."""
+    from psycopg2.extras import execute_values
+
+    rows = [
+        (str(n.id), n.recipient_id, n.notification_type, n.title, n.message, n.document_id, n.actor_id, n.read)
+        for n in notifications
+    ]
+    # created_at is stamped by the database at write time, as auto_now_add does for the ORM
+    sql = 'INSERT INTO {} (created_at, {}) VALUES %s'.format(Notification._meta.db_table, ', '.join(_NOTIFICATION_COLUMNS))
+    template = '(now(), {})'.format(', '.join(['%s'] * len(_NOTIFICATION_COLUMNS)))
+    with connection.cursor() as cursor:
+        execute_values(cursor.cursor, sql, rows, template=template, page_size=NOTIFICATION_BATCH_SIZE)
+    return notifications
+
+
+def create_notifications_bulk(notifications):
+    """Insert unsaved Notification instances with multi-row INSERTs."""
+    if not notifications:
+        return []
+    try:
+        if connection.vendor == 'postgresql':
+            with transaction.atomic():
+                return _insert_notifications_postgres(notifications)
+        return Notification.objects.bulk_create(notifications, batch_size=NOTIFICATION_BATCH_SIZE)
+    except Exception as e:
+        logger.error(f'Failed to create notifications: {e}')
+        return []
+
+
 def notify_document_edited(document, editor):
-    if document.owner and document.owner != editor:
+    # Compare by id so the owner is only loaded when there is someone to notify
+    if document.owner_id and document.owner_id != editor.id:
         create_notification(
             recipient=document.owner,
             notification_type=NotificationType.DOCUMENT_EDITED,
@@ -35,107 +88,145 @@ def notify_document_edited(document, editor):
 
 
 def notify_document_deleted(document, deleter):
-    notified = set()
-    if document.owner and document.owner != deleter:
-        create_notification(
-            recipient=document.owner,
+    notified = {deleter.id}
+    notifications = []
+    title = f'Document deleted: {document.title}'
+    if document.owner_id and document.owner_id != deleter.id:
+        notifications.append(Notification(
+            recipient_id=document.owner_id,
             notification_type=NotificationType.DOCUMENT_DELETED,
-            title=f'Document deleted: {document.title}',
+            title=title,
             message=f'{deleter.username} deleted the document "{document.title}".',
             actor=deleter,
+        ))
+        notified.add(document.owner_id)
+
+    # Only the typed subject columns are needed; the (document, subject_type, ...) index serves the filter
+    acls = list(
+        ACL.objects.filter(document=document, subject_type__in=('user', 'group'))
+        .order_by()
+        .values_list('subject_type', 'subject_user_id', 'subject_group_id')
+    )
+
+    # Members of every shared group in one query on the membership table
+    group_ids = {subject_group_id for _, _, subject_group_id in acls if subject_group_id is not None}
+    members = {}
+    group_names = {}
+    if group_ids:
+        memberships = User.groups.through.objects.filter(group_id__in=group_ids).values_list('group_id', 'user_id', 'group__name')
+        for group_id, user_id, group_name in memberships:
+            members.setdefault(group_id, []).append(user_id)
+            group_names[group_id] = group_name
+
+    # Users are linked by id, so they never need to be loaded
+    for subject_type, subject_user_id, subject_group_id in acls:
+        if subject_type == 'user':
+            user_ids = [subject_user_id] if subject_user_id is not None else []
+        else:
+            user_ids = members.get(subject_group_id, [])
+        new_ids = [user_id for user_id in user_ids if user_id not in notified]
+        if not new_ids:
+            continue
+        # Format the message only for ACLs that still reach someone
+        if subject_type == 'user':
+            message = f'{deleter.username} deleted the document "{document.title}" you had access to.'
+        else:
+            message = f'{deleter.username} deleted the document "{document.title}" shared with group "{group_names[subject_group_id]}".'
+        notifications.extend(
+            Notification(
+                recipient_id=user_id,
+                notification_type=NotificationType.DOCUMENT_DELETED,
+                title=title,
+                message=message,
+                actor=deleter,
+            )
+            for user_id in new_ids
         )
-        notified.add(document.owner.id)
+        notified.update(new_ids)
+
+    create_notifications_bulk(notifications)
+
 
-    acls = ACL.objects.filter(document=document)
+def _group_member_ids(group_ids):
+    """Map each group id to its members' ids, read from the membership table in one query."""
+    members = {}
+    if group_ids:
+        memberships = User.groups.through.objects.filter(group_id__in=group_ids).values_list('group_id', 'user_id')
+        for group_id, user_id in memberships:
+            members.setdefault(group_id, []).append(user_id)
+    return members
+
+
+def _get_acl_recipients_bulk(acls, exclude_user=None):
+    """Map each ACL id to the ids of the users it grants access to, excluding exclude_user."""
+    members = _group_member_ids({acl.subject_group_id for acl in acls if acl.subject_group_id is not None})
+    exclude_id = exclude_user.pk if exclude_user else None
+    recipients = {}
     for acl in acls:
         if acl.subject_type == 'user':
-            try:
-                user = User.objects.get(id=int(acl.subject_id))
-                if user.id not in notified and user != deleter:
-                    create_notification(
-                        recipient=user,
-                        notification_type=NotificationType.DOCUMENT_DELETED,
-                        title=f'Document deleted: {document.title}',
-                        message=f'{deleter.username} deleted the document "{document.title}" you had access to.',
-                        actor=deleter,
-                    )
-                    notified.add(user.id)
-            except (User.DoesNotExist, ValueError):
-                pass
+            user_ids = [acl.subject_user_id] if acl.subject_user_id is not None else []
         elif acl.subject_type == 'group':
-            try:
-                group = Group.objects.get(id=int(acl.subject_id))
-                for user in group.user_set.all():
-                    if user.id not in notified and user != deleter:
-                        create_notification(
-                            recipient=user,
-                            notification_type=NotificationType.DOCUMENT_DELETED,
-                            title=f'Document deleted: {document.title}',
-                            message=f'{deleter.username} deleted the document "{document.title}" shared with group "{group.name}".',
-                            actor=deleter,
-                        )
-                        notified.add(user.id)
-            except (Group.DoesNotExist, ValueError):
-                pass
+            user_ids = members.get(acl.subject_group_id, [])
+        else:
+            user_ids = []
+        recipients[acl.id] = [user_id for user_id in user_ids if user_id != exclude_id]
+    return recipients
 
 
 def _get_acl_recipients(acl, exclude_user=None):
-    recipients = []
-    if acl.subject_type == 'user':
-        try:
-            user = User.objects.get(id=int(acl.subject_id))
-            if user != exclude_user:
-                recipients.append(user)
-        except (User.DoesNotExist, ValueError):
-            pass
-    elif acl.subject_type == 'group':
-        try:
-            group = Group.objects.get(id=int(acl.subject_id))
-            for user in group.user_set.all():
-                if user != exclude_user:
-                    recipients.append(user)
-        except (Group.DoesNotExist, ValueError):
-            pass
-    return recipients
+    return _get_acl_recipients_bulk([acl], exclude_user=exclude_user)[acl.id]
+
+
+def _acl_document_title(acl):
+    """Title of the ACL's document, dereferencing the FK once (callers select_related('document'))."""
+    if acl.document_id is None:
+        return 'Unknown'
+    return acl.document.title
 
 
 def notify_acl_granted(acl, granter):
-    doc_title = acl.document.title if acl.document else 'Unknown'
-    for recipient in _get_acl_recipients(acl, exclude_user=granter):
-        create_notification(
-            recipient=recipient,
+    doc_title = _acl_document_title(acl)
+    create_notifications_bulk([
+        Notification(
+            recipient_id=recipient_id,
             notification_type=NotificationType.ACL_GRANTED,
             title=f'Access granted: {doc_title}',
             message=f'{granter.username} granted you {acl.role} access to "{doc_title}".',
-            document=acl.document,
+            document_id=acl.document_id,
             actor=granter,
         )
+        for recipient_id in _get_acl_recipients(acl, exclude_user=granter)
+    ])
 
 
 def notify_acl_revoked(acl, revoker):
-    doc_title = acl.document.title if acl.document else 'Unknown'
-    for recipient in _get_acl_recipients(acl, exclude_user=revoker):
-        create_notification(
-            recipient=recipient,
+    doc_title = _acl_document_title(acl)
+    create_notifications_bulk([
+        Notification(
+            recipient_id=recipient_id,
             notification_type=NotificationType.ACL_REVOKED,
             title=f'Access revoked: {doc_title}',
             message=f'{revoker.username} revoked your access to "{doc_title}".',
-            document=acl.document,
+            document_id=acl.document_id,
             actor=revoker,
         )
+        for recipient_id in _get_acl_recipients(acl, exclude_user=revoker)
+    ])
 
 
 def notify_acl_changed(acl, old_role, new_role, changer):
-    doc_title = acl.document.title if acl.document else 'Unknown'
-    for recipient in _get_acl_recipients(acl, exclude_user=changer):
-        create_notification(
-            recipient=recipient,
+    doc_title = _acl_document_title(acl)
+    create_notifications_bulk([
+        Notification(
+            recipient_id=recipient_id,
             notification_type=NotificationType.ACL_CHANGED,
             title=f'Access changed: {doc_title}',
             message=f'{changer.username} changed your access to "{doc_title}" from {old_role} to {new_role}.',
-            document=acl.document,
+            document_id=acl.document_id,
             actor=changer,
         )
+        for recipient_id in _get_acl_recipients(acl, exclude_user=changer)
+    ])
 
 
 def notify_account_approved(user):
@@ -159,25 +250,110 @@ def notify_account_rejected(user, reason=''):
     )
 
 
-def notify_new_registration(new_user):
-    admins = User.objects.filter(is_superuser=True)
-    for admin in admins:
-        create_notification(
-            recipient=admin,
-            notification_type=NotificationType.NEW_REGISTRATION,
-            title='New user registration',
-            message=f'{new_user.username} ({new_user.email}) has registered and is awaiting approval.',
-            actor=new_user,
+def _get_admin_ids():
+    """Ids of the superusers, cached briefly since every signup notifies them."""
+    return cache.get_or_set(
+        ADMIN_IDS_CACHE_KEY,
+        lambda: list(User.objects.filter(is_superuser=True).values_list('id', flat=True)),
+        ADMIN_IDS_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_admin_ids(sender, instance, update_fields=None, **kwargs):
+    """post_save/post_delete receiver for User: drop the cached superuser ids when they may have changed."""
+    if update_fields is not None and 'is_superuser' not in update_fields:
+        return
+    cache.delete(ADMIN_IDS_CACHE_KEY)
+
+
+def _write_admin_notifications(notification_type, title, message, actor_id):
+    create_notifications_bulk([
+        Notification(
+            recipient_id=admin_id,
+            notification_type=notification_type,
+            title=title,
+            message=message,
+            actor_id=actor_id,
         )
+        for admin_id in _get_admin_ids()
+    ])
+
+
+def _admin_notice_worker_loop():
+    """Write queued admin notifications with the worker's own connection."""
+    while True:
+        payload = _admin_notice_queue.get()
+        try:
+            close_old_connections()
+            _write_admin_notifications(**payload)
+        except Exception:
+            # Keep the thread alive: an uncaught error would end it and drop what is queued
+            logger.exception(f"Failed to write admin notifications: {payload['title']}")
+        finally:
+            _admin_notice_queue.task_done()
+
+
+def _flush_admin_notice_queue():
+    """Write whatever is still queued (called at interpreter shutdown)."""
+    while True:
+        try:
+            payload = _admin_notice_queue.get_nowait()
+        except queue.Empty:
+            return
+        try:
+            _write_admin_notifications(**payload)
+        except Exception:
+            logger.exception(f"Failed to write admin notifications: {payload['title']}")
+        _admin_notice_queue.task_done()
+
+
+def _ensure_admin_notice_worker():
+    global _admin_notice_worker
+    if _admin_notice_worker is not None and _admin_notice_worker.is_alive():
+        return
+    with _admin_notice_worker_lock:
+        if _admin_notice_worker is None or not _admin_notice_worker.is_alive():
+            _admin_notice_worker = threading.Thread(target=_admin_notice_worker_loop, name='admin-notification-writer', daemon=True)
+            _admin_notice_worker.start()
+
+
+atexit.register(_flush_admin_notice_queue)
+
+
+def notify_admins(notification_type, title, message, actor=None):
+    """
+    Notify every superuser.
+
+    The notifications are queued for the background writer unless
+    NOTIFY_ADMINS_ASYNC is disabled, in which case they are written before
+    returning.
+    """
+    payload = {
+        'notification_type': notification_type,
+        'title': title,
+        'message': message,
+        'actor_id': actor.pk if actor else None,
+    }
+    if getattr(settings, 'NOTIFY_ADMINS_ASYNC', True):
+        _ensure_admin_notice_worker()
+        _admin_notice_queue.put(payload)
+    else:
+        _write_admin_notifications(**payload)
+
+
+def notify_new_registration(new_user):
+    notify_admins(
+        NotificationType.NEW_REGISTRATION,
+        'New user registration',
+        f'{new_user.username} ({new_user.email}) has registered and is awaiting approval.',
+        actor=new_user,
+    )
 
 
 def notify_email_verified(user):
-    admins = User.objects.filter(is_superuser=True)
-    for admin in admins:
-        create_notification(
-            recipient=admin,
-            notification_type=NotificationType.EMAIL_VERIFIED,
-            title='Email verified',
-            message=f'{user.username} ({user.email}) has verified their email and is now pending approval.',
-            actor=user,
-        )
+    notify_admins(
+        NotificationType.EMAIL_VERIFIED,
+        'Email verified',
+        f'{user.username} ({user.email}) has verified their email and is now pending approval.',
+        actor=user,
+    )
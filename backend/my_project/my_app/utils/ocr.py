@@ -2,102 +2,333 @@
 OCR utility functions using EasyOCR for text extraction from images and PDFs.
 """
 
+import contextlib
+import hashlib
 import io
 import logging
+import multiprocessing
 import os
 import re
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Tuple, List
+from typing import Iterable, Iterator, Optional, Tuple, List, Union
 from PIL import Image, ImageEnhance, ImageFilter
 import easyocr
 import cv2
 import numpy as np
+import torch
 from django.conf import settings
 
+try:
+    import pymupdf  # PyMuPDF: rasterizes PDF pages in-process
+except ImportError:
+    try:  # PyMuPDF < 1.24.3 only ships the legacy 'fitz' name
+        import fitz as pymupdf
+    except ImportError:  # fall back to pdf2image/Poppler
+        pymupdf = None
+
 logger = logging.getLogger(__name__)
 
+# Reader configuration, fixed for the life of the process
+EASYOCR_LANGUAGES = getattr(settings, 'EASYOCR_LANGUAGES', ['en'])
+EASYOCR_GPU = getattr(settings, 'EASYOCR_GPU', False)
+
 # Global EasyOCR reader instance (initialized once for performance)
 _ocr_reader = None
+_ocr_reader_lock = threading.Lock()
+# Whether inference runs under FP16 autocast (EASYOCR_PRECISION = 'fp16' on CUDA)
+_ocr_fp16 = False
+# Worker processes reading PDF pages in parallel, each with its own reader (EASYOCR_WORKERS)
+_ocr_pool = None
+_ocr_pool_lock = threading.Lock()
+
+def _compile_with_openvino(reader) -> None:
+    """
+    Compile the reader's detector and recognizer with torch.compile's OpenVINO backend.
+    
+    readtext calls the models through reader.detector and reader.recognizer,
+    so swapping in the compiled modules is enough. Eager PyTorch is kept when
+    the openvino package is not installed.
+    """
+    try:
+        import openvino.torch  # noqa: F401 - registers the 'openvino' torch.compile backend
+    except ImportError:
+        logger.warning("EASYOCR_BACKEND is 'openvino' but the openvino package is not installed. Using PyTorch.")
+        return
+    
+    # Page sizes vary, so compile for dynamic shapes instead of recompiling per size
+    reader.detector = torch.compile(reader.detector, backend='openvino', dynamic=True)
+    reader.recognizer = torch.compile(reader.recognizer, backend='openvino', dynamic=True)
+    logger.info("EasyOCR models compiled with OpenVINO")
 
 def get_ocr_reader():
     """
     Get or initialize the EasyOCR reader instance.
     This is done globally to avoid reinitializing the model for each request.
+    The lock keeps concurrent first requests from each building a reader.
     """
-    global _ocr_reader
+    global _ocr_reader, _ocr_fp16
     if _ocr_reader is None:
-        try:
-            languages = getattr(settings, 'EASYOCR_LANGUAGES', ['en'])
-            use_gpu = getattr(settings, 'EASYOCR_GPU', False)
-            
-            logger.info(f"Initializing EasyOCR with languages: {languages}, GPU: {use_gpu}")
-            _ocr_reader = easyocr.Reader(languages, gpu=use_gpu)
-            logger.info("EasyOCR reader initialized successfully")
-            
-        except Exception as e:
-            logger.error(f"Failed to initialize EasyOCR reader: {str(e)}")
-            raise
+        with _ocr_reader_lock:
+            if _ocr_reader is not None:
+                return _ocr_reader
+            try:
+                languages = EASYOCR_LANGUAGES
+                use_gpu = EASYOCR_GPU
+                precision = getattr(settings, 'EASYOCR_PRECISION', 'int8')
+                backend = getattr(settings, 'EASYOCR_BACKEND', 'torch')
+                model_dir = getattr(settings, 'EASYOCR_MODEL_DIR', None)
+                
+                logger.info(f"Initializing EasyOCR with languages: {languages}, GPU: {use_gpu}, precision: {precision}, backend: {backend}")
+                # cuDNN autotuning pays off once pages are fed in fixed-size batches.
+                # With quantize, EasyOCR applies dynamic int8 quantization to the
+                # detector and recognizer when they run on CPU; OpenVINO compiles the
+                # float models itself, so they are left unquantized for it.
+                reader = easyocr.Reader(languages, gpu=use_gpu, cudnn_benchmark=use_gpu,
+                                        quantize=precision == 'int8' and backend != 'openvino',
+                                        model_storage_directory=model_dir,
+                                        download_enabled=getattr(settings, 'EASYOCR_DOWNLOAD_ENABLED', True))
+                if backend == 'openvino' and reader.device == 'cpu':
+                    _compile_with_openvino(reader)
+                _ocr_fp16 = precision == 'fp16' and reader.device == 'cuda'
+                _ocr_reader = reader
+                logger.info("EasyOCR reader initialized successfully")
+                
+            except Exception as e:
+                logger.error(f"Failed to initialize EasyOCR reader: {str(e)}")
+                raise
     
     return _ocr_reader
 
+def _warm_up_ocr_reader() -> None:
+    """Load the reader and run one inference on a blank page to allocate the model buffers."""
+    try:
+        reader = get_ocr_reader()
+        with _ocr_inference():
+            reader.readtext(np.zeros((600, 800), dtype=np.uint8))
+        logger.info("EasyOCR reader warmed up")
+    except Exception as e:
+        logger.error(f"EasyOCR warm-up failed: {str(e)}")
+
+def warm_up_ocr_reader() -> None:
+    """
+    Load and warm the EasyOCR reader on a background thread.
+    
+    Called once when the WSGI application starts so that the first OCR request
+    does not wait for the models to load. Disabled by EASYOCR_WARMUP=False.
+    """
+    if not getattr(settings, 'EASYOCR_WARMUP', True):
+        return
+    threading.Thread(target=_warm_up_ocr_reader, name='ocr-reader-warmup', daemon=True).start()
+
+def _ocr_inference():
+    """Context for EasyOCR calls: FP16 autocast when enabled, otherwise a no-op."""
+    if _ocr_fp16:
+        return torch.autocast(device_type='cuda', dtype=torch.float16)
+    return contextlib.nullcontext()
+
+def _recognizer_batch_size() -> int:
+    """Text crops the recognizer reads per forward pass (EasyOCR's default of 1 reads them one by one)."""
+    return getattr(settings, 'EASYOCR_BATCH_SIZE', 8)
+
+# Consecutive same-sized PDF pages sent to EasyOCR in one readtext_batched call.
+# The detector stacks the whole batch into one tensor, so keep this small on CPU.
+PDF_OCR_BATCH_PAGES = 4
+# Threads preprocessing PDF pages ahead of OCR (OpenCV releases the GIL)
+PDF_PREPROCESS_WORKERS = min(4, os.cpu_count() or 1)
+# PDF pages rasterized ahead of preprocessing and OCR, on a thread of their own
+PDF_RENDER_AHEAD = 2
+
+# Number of leading PDF pages sent to OCR (the resolution is the OCR_PDF_DPI setting)
+PDF_MAX_PAGES = 20
+
+# Detections at or below this confidence are dropped
+MIN_BLOCK_CONFIDENCE = 0.3
+# Pixels - a block joins the current line when its centre is this close to the line's mean centre
+LINE_GROUP_THRESHOLD = 20
+
+# Uploaded images whose OCR results are kept, keyed by a hash of their bytes, so
+# the same image sent to both OCR endpoints is only read once
+OCR_RESULT_CACHE_SIZE = 16
+_ocr_result_cache = OrderedDict()
+_ocr_result_cache_lock = threading.Lock()
+
+# Share of pixels in the darkest and lightest sixteenths above which an image
+# counts as high-contrast and CLAHE is skipped
+HIGH_CONTRAST_PIXEL_SHARE = 0.7
+
+# EasyOCR supported languages (as of version 1.7+)
+_SUPPORTED_LANGUAGES = (
+    'en', 'ch_sim', 'ch_tra', 'ja', 'ko', 'th', 'vi', 'ar', 'bg', 'cs', 'da', 'de', 
+    'el', 'es', 'et', 'fi', 'fr', 'hr', 'hu', 'id', 'it', 'lt', 'lv', 'mt', 'nl', 
+    'no', 'pl', 'pt', 'ro', 'ru', 'sk', 'sl', 'sq', 'sv', 'tr', 'uk', 'bn', 'gu', 
+    'hi', 'kn', 'ml', 'mr', 'ne', 'or', 'pa', 'sa', 'ta', 'te', 'ur', 'fa', 'he', 
+    'my', 'ka', 'ky', 'mn', 'am', 'az', 'be', 'cy', 'eu', 'ga', 'gl', 'is', 'la', 
+    'lb', 'mk', 'ms', 'sw', 'tl', 'yo', 'zu'
+)
+
 # Supported file extensions
-SUPPORTED_IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.tif', '.webp'}
-SUPPORTED_PDF_EXTENSIONS = {'.pdf'}
+SUPPORTED_IMAGE_EXTENSIONS = frozenset({'.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.tif', '.webp'})
+SUPPORTED_PDF_EXTENSIONS = frozenset({'.pdf'})
 ALL_SUPPORTED_EXTENSIONS = SUPPORTED_IMAGE_EXTENSIONS | SUPPORTED_PDF_EXTENSIONS
 
-def preprocess_image_for_ocr(image: Image.Image) -> np.ndarray:
+def _grayscale_array(image: Union[Image.Image, np.ndarray]) -> np.ndarray:
+    """Return the image as a single-channel uint8 array (ndarrays are taken as grayscale or RGB)."""
+    if isinstance(image, np.ndarray):
+        return image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+    return np.asarray(image if image.mode == 'L' else image.convert('L'))
+
+def _is_high_contrast(gray: np.ndarray) -> bool:
+    """True when most pixels sit at the dark or light end of the histogram (e.g. a rendered vector page)."""
+    hist = cv2.calcHist([gray], [0], None, [16], [0, 256])
+    return hist[0, 0] + hist[-1, 0] > HIGH_CONTRAST_PIXEL_SHARE * gray.size
+
+def preprocess_image_for_ocr(image: Union[Image.Image, np.ndarray], is_pdf_raster: bool = False) -> np.ndarray:
     """
     Preprocess image for better EasyOCR performance.
     
+    The image is reduced to grayscale before anything else, so the resize and
+    CLAHE passes touch a third of the bytes and no colour copies are made.
+    CLAHE is skipped on images that are already high-contrast, where it only
+    amplifies anti-aliasing, and on every PDF page when OCR_SKIP_CLAHE_FOR_PDF is set.
+    
     Args:
-        image: PIL Image object
+        image: PIL Image object, or numpy array of a rendered page (grayscale or RGB)
+        is_pdf_raster: Whether the image is a page rendered from a PDF
         
     Returns:
-        Preprocessed image as numpy array for EasyOCR
+        Preprocessed single-channel (grayscale) numpy array for EasyOCR
     """
     try:
-        # Convert PIL image to OpenCV format (numpy array)
-        if image.mode != 'RGB':
-            image = image.convert('RGB')
-        
-        # Convert to numpy array
-        img_array = np.array(image)
-        
-        # Convert RGB to BGR for OpenCV
-        img_array = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
+        # Grayscale in one pass, no RGB/BGR intermediates
+        gray = _grayscale_array(image)
         
         # Resize if image is too small (EasyOCR works better on larger images)
-        height, width = img_array.shape[:2]
+        height, width = gray.shape[:2]
         if width < 640 or height < 640:
             scale_factor = max(640 / width, 640 / height)
             new_width = int(width * scale_factor)
             new_height = int(height * scale_factor)
-            img_array = cv2.resize(img_array, (new_width, new_height), interpolation=cv2.INTER_CUBIC)
+            # Bilinear is enough for the detector and much cheaper than bicubic
+            gray = cv2.resize(gray, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
             logger.info(f"Resized image from {width}x{height} to {new_width}x{new_height}")
         
-        # Apply image enhancements for better OCR
-        # Convert to grayscale for processing
-        gray = cv2.cvtColor(img_array, cv2.COLOR_BGR2GRAY)
+        if is_pdf_raster and getattr(settings, 'OCR_SKIP_CLAHE_FOR_PDF', False):
+            return gray
+        if _is_high_contrast(gray):
+            return gray
         
-        # Apply adaptive histogram equalization
+        # Apply adaptive histogram equalization; EasyOCR accepts the
+        # single-channel result as is
         clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-        enhanced = clahe.apply(gray)
-        
-        # Apply Gaussian blur to reduce noise
-        blurred = cv2.GaussianBlur(enhanced, (1, 1), 0)
-        
-        # Convert back to BGR for EasyOCR
-        processed_img = cv2.cvtColor(blurred, cv2.COLOR_GRAY2BGR)
-        
-        return processed_img
+        return clahe.apply(gray)
         
     except Exception as e:
         logger.warning(f"Image preprocessing failed: {str(e)}. Using original image.")
-        # Fallback: return original image as numpy array
-        if image.mode != 'RGB':
-            image = image.convert('RGB')
-        img_array = np.array(image)
-        return cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
+        # Fallback: return original image as a grayscale numpy array
+        return _grayscale_array(image)
+
+def _layout_ocr_results(results) -> Optional[dict]:
+    """
+    Filter EasyOCR results by confidence and group the kept blocks into lines.
+    
+    Box geometry is held as NumPy columns over all blocks instead of one dict
+    per block, and the reading-order sorts run in C.
+    
+    Args:
+        results: List of (bbox, text, confidence) tuples from EasyOCR
+        
+    Returns:
+        Dict of per-block columns (texts, confidences, boxes, x, y, width, height),
+        the reading order of the blocks (top to bottom, then left to right), the
+        block indices line by line (by_line, with each line's start offset in
+        line_starts) and the lines as arrays of block indices sorted left to
+        right, or None when no block is confident enough
+    """
+    kept = [result for result in results if result[2] > MIN_BLOCK_CONFIDENCE]
+    if not kept:
+        return None
+    
+    # bbox is [[x1,y1], [x2,y2], [x3,y3], [x4,y4]]; top-left and bottom-right give centre and size
+    boxes = np.asarray([bbox for bbox, _, _ in kept], dtype=np.float64)
+    top_left = boxes[:, 0]
+    bottom_right = boxes[:, 2]
+    x_center = (top_left[:, 0] + bottom_right[:, 0]) / 2
+    y_center = (top_left[:, 1] + bottom_right[:, 1]) / 2
+    
+    # Reading order: by y, then by x
+    order = np.lexsort((x_center, y_center))
+    
+    # A line's mean centre moves as blocks join it, so assigning line ids is a
+    # single running pass over the sorted centres
+    line_ids = np.empty(len(order), dtype=np.intp)
+    line_id = -1
+    line_sum = 0.0
+    line_len = 0
+    for position, y in enumerate(y_center[order].tolist()):
+        if line_len and abs(y - line_sum / line_len) <= LINE_GROUP_THRESHOLD:
+            line_sum += y
+            line_len += 1
+        else:
+            line_id += 1
+            line_sum = y
+            line_len = 1
+        line_ids[position] = line_id
+    
+    # Sort each line left to right; the stable sort keeps the line order
+    by_line = order[np.lexsort((x_center[order], line_ids))]
+    line_starts = np.concatenate(([0], np.flatnonzero(np.diff(line_ids)) + 1))
+    
+    return {
+        'texts': [text.strip() for _, text, _ in kept],
+        'confidences': np.asarray([confidence for _, _, confidence in kept], dtype=np.float64),
+        'boxes': boxes,
+        'x': x_center,
+        'y': y_center,
+        'width': np.abs(bottom_right[:, 0] - top_left[:, 0]),
+        'height': np.abs(bottom_right[:, 1] - top_left[:, 1]),
+        'order': order,
+        'by_line': by_line,
+        'line_starts': line_starts,
+        'lines': np.split(by_line, line_starts[1:]),
+    }
+
+def _line_texts(layout: dict) -> List[str]:
+    """Text of each line of a _layout_ocr_results layout, its blocks joined left to right."""
+    texts = layout['texts']
+    texts_by_line = [texts[i] for i in layout['by_line'].tolist()]
+    bounds = layout['line_starts'].tolist() + [len(texts_by_line)]
+    return [' '.join(texts_by_line[start:end]).strip() for start, end in zip(bounds, bounds[1:])]
+
+def _text_from_ocr_results(results) -> Tuple[str, float]:
+    """
+    Turn EasyOCR readtext results into text with line breaks in reading order.
+    
+    Args:
+        results: List of (bbox, text, confidence) tuples from EasyOCR
+        
+    Returns:
+        Tuple of (extracted_text, average_confidence)
+    """
+    if not results:
+        logger.warning("No text detected by EasyOCR")
+        return "", 0.0
+    
+    layout = _layout_ocr_results(results)
+    if layout is None:
+        logger.warning("No text with sufficient confidence detected")
+        return "", 0.0
+    
+    # Construct the final text with proper line breaks
+    texts = layout['texts']
+    full_text = '\n'.join(_line_texts(layout))
+    avg_confidence = float(layout['confidences'].mean())
+    
+    logger.info(f"EasyOCR extracted {len(texts)} text segments in {len(layout['lines'])} lines, avg confidence: {avg_confidence:.2f}")
+    
+    return full_text, avg_confidence
 
 def extract_text_with_easyocr(image_array: np.ndarray) -> Tuple[str, float]:
     """
@@ -113,93 +344,176 @@ def extract_text_with_easyocr(image_array: np.ndarray) -> Tuple[str, float]:
         reader = get_ocr_reader()
         
         # Extract text with EasyOCR
-        results = reader.readtext(image_array)
-        
-        if not results:
-            logger.warning("No text detected by EasyOCR")
-            return "", 0.0
-        
-        # Process results with positioning
-        text_blocks = []
-        confidences = []
-        
-        for (bbox, text, confidence) in results:
-            if confidence > 0.3:  # Filter out low-confidence detections
-                # Extract bounding box coordinates
-                # bbox is [[x1,y1], [x2,y2], [x3,y3], [x4,y4]]
-                top_left = bbox[0]
-                bottom_right = bbox[2]
-                
-                # Calculate center position and dimensions
-                x_center = (top_left[0] + bottom_right[0]) / 2
-                y_center = (top_left[1] + bottom_right[1]) / 2
-                width = abs(bottom_right[0] - top_left[0])
-                height = abs(bottom_right[1] - top_left[1])
-                
-                text_blocks.append({
-                    'text': text.strip(),
-                    'confidence': confidence,
-                    'x': x_center,
-                    'y': y_center,
-                    'width': width,
-                    'height': height,
-                    'bbox': bbox
-                })
-                confidences.append(confidence)
-                logger.debug(f"Detected text: '{text}' at ({x_center:.0f}, {y_center:.0f}) with confidence: {confidence:.2f}")
-        
-        if not text_blocks:
-            logger.warning("No text with sufficient confidence detected")
-            return "", 0.0
-        
-        # Sort text blocks by vertical position (y-coordinate) first, then horizontal (x-coordinate)
-        # This creates a reading order from top to bottom, left to right
-        text_blocks.sort(key=lambda block: (block['y'], block['x']))
-        
-        # Group text blocks into lines based on vertical proximity
-        lines = []
-        current_line = []
-        line_threshold = 20  # Pixels - adjust based on typical text height
-        
-        for block in text_blocks:
-            if not current_line:
-                current_line = [block]
-            else:
-                # Check if this block is on the same line as the previous ones
-                avg_y = sum(b['y'] for b in current_line) / len(current_line)
-                if abs(block['y'] - avg_y) <= line_threshold:
-                    current_line.append(block)
-                else:
-                    # Start a new line
-                    if current_line:
-                        # Sort current line by x-coordinate (left to right)
-                        current_line.sort(key=lambda b: b['x'])
-                        lines.append(current_line)
-                    current_line = [block]
-        
-        # Add the last line
-        if current_line:
-            current_line.sort(key=lambda b: b['x'])
-            lines.append(current_line)
-        
-        # Construct the final text with proper line breaks
-        final_lines = []
-        for line in lines:
-            line_text = ' '.join(block['text'] for block in line)
-            final_lines.append(line_text.strip())
-        
-        # Join lines with newline characters
-        full_text = '\n'.join(final_lines)
-        avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        with _ocr_inference():
+            results = reader.readtext(image_array, batch_size=_recognizer_batch_size())
         
-        logger.info(f"EasyOCR extracted {len(text_blocks)} text segments in {len(lines)} lines, avg confidence: {avg_confidence:.2f}")
-        
-        return full_text, avg_confidence
+        return _text_from_ocr_results(results)
         
     except Exception as e:
         logger.error(f"EasyOCR text extraction failed: {str(e)}")
         return f"Error during OCR processing: {str(e)}", 0.0
 
+def _prefetch(items: Iterable, ahead: int) -> Iterator:
+    """
+    Pull items from an iterator on a background thread, staying up to `ahead` items in front.
+    
+    The iterator is only ever advanced from that one thread, so a generator
+    holding non thread-safe state (an open PDF) can be handed over as is.
+    Exceptions it raises surface in the consumer at the item they replace.
+    """
+    iterator = iter(items)
+    done = object()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pending = deque(executor.submit(next, iterator, done) for _ in range(ahead))
+        while True:
+            item = pending.popleft().result()
+            if item is done:
+                return
+            pending.append(executor.submit(next, iterator, done))
+            yield item
+
+def _preprocess_pages(pages: Iterable[np.ndarray]) -> Iterator[Tuple[np.ndarray, int, int]]:
+    """
+    Preprocess rendered pages on a thread pool, yielding them in page order.
+    
+    Pages are preprocessed ahead while the caller runs OCR on the ones
+    already yielded. At most PDF_PREPROCESS_WORKERS pages are pulled ahead of
+    the consumer, so only the pages in flight are held in memory.
+    
+    Yields:
+        Tuple of (preprocessed page, rendered width, rendered height)
+    """
+    def prepare(page):
+        height, width = page.shape[:2]
+        return preprocess_image_for_ocr(page, is_pdf_raster=True), width, height
+    
+    with ThreadPoolExecutor(max_workers=PDF_PREPROCESS_WORKERS) as executor:
+        pending = deque()
+        for page in pages:
+            pending.append(executor.submit(prepare, page))
+            if len(pending) > PDF_PREPROCESS_WORKERS:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def _readtext_batch(reader, batch: List[np.ndarray], first_page: int) -> list:
+    """Run EasyOCR over same-shaped pages in one call, falling back to one call per page."""
+    batch_size = _recognizer_batch_size()
+    if len(batch) == 1:
+        return [reader.readtext(batch[0], batch_size=batch_size)]
+    try:
+        return reader.readtext_batched(batch, batch_size=batch_size)
+    except Exception as e:
+        logger.warning(f"Batched OCR failed for pages {first_page}-{first_page + len(batch) - 1}: {str(e)}. Processing them one by one.")
+        return [reader.readtext(page, batch_size=batch_size) for page in batch]
+
+def _page_batches(pages: Iterable[Tuple[np.ndarray, int, int]]) -> Iterator[list]:
+    """Group consecutive pages of equal shape into batches of at most PDF_OCR_BATCH_PAGES."""
+    batch = []
+    for page in pages:
+        if batch and (len(batch) == PDF_OCR_BATCH_PAGES or page[0].shape != batch[0][0].shape):
+            yield batch
+            batch = []
+        batch.append(page)
+    if batch:
+        yield batch
+
+def _init_ocr_worker(torch_threads: int) -> None:
+    """Process pool initializer: share the cores between workers and load the reader up front."""
+    torch.set_num_threads(torch_threads)
+    get_ocr_reader()
+
+def _readtext_batch_in_worker(batch: List[np.ndarray], first_page: int) -> list:
+    """Pool task: read one batch of pages with the worker process's own reader."""
+    with _ocr_inference():
+        return _readtext_batch(get_ocr_reader(), batch, first_page)
+
+def _get_ocr_pool() -> Optional[ProcessPoolExecutor]:
+    """Return the shared OCR process pool, or None when EASYOCR_WORKERS is below 2."""
+    global _ocr_pool
+    workers = getattr(settings, 'EASYOCR_WORKERS', 0)
+    if workers < 2:
+        return None
+    if _ocr_pool is None:
+        with _ocr_pool_lock:
+            if _ocr_pool is None:
+                # spawn, not fork: the parent's torch thread pools do not survive a fork
+                _ocr_pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_ocr_worker,
+                    initargs=(max(1, (os.cpu_count() or 1) // workers),),
+                )
+    return _ocr_pool
+
+def _readtext_pages(pages: Iterable[Tuple[np.ndarray, int, int]]) -> List[Tuple[list, int, int]]:
+    """
+    Run EasyOCR over preprocessed page images, batching consecutive pages of equal size.
+    
+    readtext_batched needs every image in a call to share one shape, which PDF
+    pages rendered at the same DPI usually do; pages of another size start a new
+    batch. Coordinates are left untouched since no page is resized. Pages are
+    consumed as they arrive, so OCR can start before all of them are preprocessed,
+    and each page image is released once its batch has been read. With
+    EASYOCR_WORKERS set, batches are spread over the OCR process pool, with at
+    most one batch per worker waiting.
+    
+    Args:
+        pages: (preprocessed page, width, height) tuples, in page order
+        
+    Returns:
+        List of (readtext results, width, height) for each page, in page order
+    """
+    page_results = []
+    
+    def collect(results, sizes):
+        page_results.extend((result, width, height) for result, (width, height) in zip(results, sizes))
+    
+    pool = _get_ocr_pool()
+    if pool is None:
+        reader = get_ocr_reader()
+        with _ocr_inference():
+            for batch in _page_batches(pages):
+                results = _readtext_batch(reader, [page for page, _, _ in batch], len(page_results) + 1)
+                collect(results, [(width, height) for _, width, height in batch])
+        return page_results
+    
+    max_pending = getattr(settings, 'EASYOCR_WORKERS', 0)
+    pending = deque()
+    first_page = 1
+    for batch in _page_batches(pages):
+        future = pool.submit(_readtext_batch_in_worker, [page for page, _, _ in batch], first_page)
+        pending.append((future, [(width, height) for _, width, height in batch]))
+        first_page += len(batch)
+        if len(pending) > max_pending:
+            future, sizes = pending.popleft()
+            collect(future.result(), sizes)
+    while pending:
+        future, sizes = pending.popleft()
+        collect(future.result(), sizes)
+    return page_results
+
+def _ocr_pdf_pages(pdf_bytes: bytes) -> List[Tuple[list, int, int]]:
+    """
+    Render, preprocess and OCR the pages of a PDF as one stream.
+    
+    Rasterization runs on its own thread a few pages ahead, so the next pages
+    are rendered while the current ones are in OCR.
+    
+    Args:
+        pdf_bytes: Raw PDF bytes
+        
+    Returns:
+        List of (readtext results, rendered width, rendered height) for each page
+    """
+    return _readtext_pages(_preprocess_pages(_prefetch(_render_pdf_pages(pdf_bytes), PDF_RENDER_AHEAD)))
+
+# Patterns used by post_process_ocr_text, compiled once
+_OCR_CHAR_FIXES = {'0': 'O', 'l': 'I'}
+_OCR_CHAR_FIX_RE = re.compile(r'\b[0l]\b')
+_OCR_SPACED_PUNCTUATION = frozenset('.!?,;:')
+_OCR_PUNCT_SPACING_RE = re.compile(r'(?<=[.!?])(?=[A-Z])|(?<=[,;:])(?=[A-Za-z])')
+
 def post_process_ocr_text(text: str) -> str:
     """
     Post-process OCR text to improve readability and fix common issues.
@@ -218,31 +532,19 @@ def post_process_ocr_text(text: str) -> str:
     # Store original for comparison
     original_text = text
     
-    # Step 1: Basic cleanup
-    text = text.strip()
+    # Steps 1-2: Basic cleanup and spacing - collapse every whitespace run
+    # (line breaks included) to one space and trim the ends
+    text = ' '.join(text.split())
     
-    # Step 2: Fix common spacing issues
-    # Remove excessive spaces
-    text = re.sub(r'\s+', ' ', text)
-    
-    # Step 3: Fix common OCR errors
-    # Fix common character substitutions
-    text = re.sub(r'\b0\b', 'O', text)  # Zero to O in words
-    text = re.sub(r'\bl\b', 'I', text)  # lowercase l to I when standalone
+    # Step 3: Fix common OCR errors - standalone zero to O, standalone lowercase l to I.
+    # The substring checks are plain C scans that spare the regex pass when nothing can match.
+    if '0' in text or 'l' in text:
+        text = _OCR_CHAR_FIX_RE.sub(lambda match: _OCR_CHAR_FIXES[match.group()], text)
     
     # Step 4: Improve sentence structure
     # Ensure proper spacing after punctuation
-    text = re.sub(r'([.!?])([A-Z])', r'\1 \2', text)
-    text = re.sub(r'([,;:])([A-Za-z])', r'\1 \2', text)
-    
-    # Step 5: Fix line breaks and paragraphs
-    # Normalize line breaks
-    text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)  # Max double line breaks
-    text = re.sub(r'[ \t]+\n', '\n', text)          # Remove trailing spaces
-    text = re.sub(r'\n[ \t]+', '\n', text)          # Remove leading spaces after newlines
-    
-    # Final cleanup
-    text = text.strip()
+    if not _OCR_SPACED_PUNCTUATION.isdisjoint(text):
+        text = _OCR_PUNCT_SPACING_RE.sub(' ', text)
     
     # Log improvements
     if text != original_text:
@@ -250,6 +552,164 @@ def post_process_ocr_text(text: str) -> str:
     
     return text
 
+def _detailed_blocks_and_lines(layout: dict) -> Tuple[list, list]:
+    """
+    Build the block and line dicts returned by extract_text_with_positions.
+    
+    Args:
+        layout: Result of _layout_ocr_results
+        
+    Returns:
+        Tuple of (blocks in reading order, line info dicts)
+    """
+    texts = layout['texts']
+    confidences = layout['confidences'].tolist()
+    # EasyOCR's pixel coordinates are integers; the float64 columns only serve the
+    # centre and sorting maths, so corners and sizes go back out as ints
+    boxes = layout['boxes'].astype(np.int64)
+    geometry = zip(boxes.tolist(), layout['x'].tolist(), layout['y'].tolist(),
+                   layout['width'].astype(np.int64).tolist(), layout['height'].astype(np.int64).tolist())
+    blocks = [
+        {
+            'text': texts[i],
+            'confidence': confidences[i],
+            'position': {
+                'x': x,
+                'y': y,
+                'width': width,
+                'height': height
+            },
+            'bbox': {
+                'top_left': bbox[0],
+                'top_right': bbox[1],
+                'bottom_right': bbox[2],
+                'bottom_left': bbox[3]
+            }
+        }
+        for i, (bbox, x, y, width, height) in enumerate(geometry)
+    ]
+    
+    # Per-line bounding boxes and mean confidences, reduced over all lines at once
+    by_line = layout['by_line']
+    line_starts = layout['line_starts']
+    line_boxes = boxes[by_line]
+    min_x = np.minimum.reduceat(line_boxes[:, 0, 0], line_starts).tolist()
+    min_y = np.minimum.reduceat(line_boxes[:, 0, 1], line_starts).tolist()
+    max_x = np.maximum.reduceat(line_boxes[:, 2, 0], line_starts).tolist()
+    max_y = np.maximum.reduceat(line_boxes[:, 2, 1], line_starts).tolist()
+    line_sizes = np.diff(np.append(line_starts, len(by_line)))
+    line_confidences = (np.add.reduceat(layout['confidences'][by_line], line_starts) / line_sizes).tolist()
+    line_texts = _line_texts(layout)
+    
+    line_info = []
+    for i, line in enumerate(layout['lines']):
+        line = line.tolist()
+        line_info.append({
+            'line_number': i + 1,
+            'text': line_texts[i],
+            'blocks': [blocks[j] for j in line],
+            'bbox': {
+                'min_x': min_x[i],
+                'min_y': min_y[i],
+                'max_x': max_x[i],
+                'max_y': max_y[i]
+            },
+            'confidence': line_confidences[i]
+        })
+    
+    return [blocks[i] for i in layout['order'].tolist()], line_info
+
+def _positions_from_ocr_results(results, width: int, height: int) -> Tuple[dict, bool]:
+    """
+    Build the detailed positioning result from EasyOCR readtext results.
+    
+    Args:
+        results: List of (bbox, text, confidence) tuples from EasyOCR
+        width: Width of the original image in pixels
+        height: Height of the original image in pixels
+        
+    Returns:
+        Tuple of (detailed_result_dict, success_flag)
+    """
+    if not results:
+        logger.warning("No text detected in image")
+        return {
+            "text": "",
+            "lines": [],
+            "blocks": [],
+            "image_size": {"width": width, "height": height},
+            "confidence": 0.0
+        }, False
+    
+    layout = _layout_ocr_results(results)
+    text_blocks, line_info = _detailed_blocks_and_lines(layout) if layout else ([], [])
+    
+    # Create final text
+    full_text = '\n'.join(line['text'] for line in line_info)
+    avg_confidence = float(layout['confidences'].mean()) if layout else 0.0
+    
+    detailed_result = {
+        "text": full_text,
+        "lines": line_info,
+        "blocks": text_blocks,
+        "image_size": {"width": width, "height": height},
+        "confidence": avg_confidence,
+        "total_blocks": len(text_blocks),
+        "total_lines": len(line_info)
+    }
+    
+    logger.info(f"Detailed extraction: {len(text_blocks)} blocks in {len(line_info)} lines")
+    
+    return detailed_result, True
+
+def _decode_image(image_bytes: bytes) -> np.ndarray:
+    """
+    Decode uploaded image bytes straight to a grayscale numpy array.
+    
+    OpenCV decodes into grayscale in one step; formats it cannot read are
+    opened with PIL instead. EXIF orientation is ignored, as PIL does.
+    """
+    image = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_GRAYSCALE | cv2.IMREAD_IGNORE_ORIENTATION)
+    if image is None:
+        image = _grayscale_array(Image.open(io.BytesIO(image_bytes)))
+    return image
+
+def _read_image_bytes(image_bytes: bytes) -> Tuple[list, int, int]:
+    """
+    Preprocess and OCR an uploaded image, reusing the results of a recent read of the same bytes.
+    
+    Args:
+        image_bytes: Raw image bytes
+        
+    Returns:
+        Tuple of (EasyOCR readtext results, image width, image height)
+    """
+    key = hashlib.blake2b(image_bytes, digest_size=16).digest()
+    with _ocr_result_cache_lock:
+        cached = _ocr_result_cache.get(key)
+        if cached is not None:
+            _ocr_result_cache.move_to_end(key)
+            logger.info("Reusing OCR results of an identical image")
+            return cached
+    
+    # Decode from bytes
+    image = _decode_image(image_bytes)
+    height, width = image.shape[:2]
+    logger.info(f"Processing image: {width}x{height} pixels")
+    
+    # Preprocess image for EasyOCR
+    processed_image = preprocess_image_for_ocr(image)
+    
+    with _ocr_inference():
+        results = get_ocr_reader().readtext(processed_image, batch_size=_recognizer_batch_size())
+    
+    entry = (results, width, height)
+    with _ocr_result_cache_lock:
+        _ocr_result_cache[key] = entry
+        while len(_ocr_result_cache) > OCR_RESULT_CACHE_SIZE:
+            _ocr_result_cache.popitem(last=False)
+    return entry
+
 def extract_text_with_positions(image_bytes: bytes) -> Tuple[dict, bool]:
     """
     Extract text from image with detailed positioning information.
@@ -261,122 +721,9 @@ def extract_text_with_positions(image_bytes: bytes) -> Tuple[dict, bool]:
         Tuple of (detailed_result_dict, success_flag)
     """
     try:
-        # Open image from bytes
-        image = Image.open(io.BytesIO(image_bytes))
-        logger.info(f"Processing image for detailed extraction: {image.size} pixels, mode: {image.mode}")
-        
-        # Preprocess image for EasyOCR
-        processed_image = preprocess_image_for_ocr(image)
-        
-        # Get EasyOCR reader
-        reader = get_ocr_reader()
+        results, width, height = _read_image_bytes(image_bytes)
         
-        # Extract text with detailed results
-        results = reader.readtext(processed_image)
-        
-        if not results:
-            logger.warning("No text detected in image")
-            return {
-                "text": "",
-                "lines": [],
-                "blocks": [],
-                "image_size": {"width": image.width, "height": image.height},
-                "confidence": 0.0
-            }, False
-        
-        # Process results with detailed positioning
-        text_blocks = []
-        confidences = []
-        
-        for (bbox, text, confidence) in results:
-            if confidence > 0.3:  # Filter out low-confidence detections
-                # Extract bounding box coordinates
-                top_left = bbox[0]
-                bottom_right = bbox[2]
-                
-                # Calculate position and dimensions
-                x_center = (top_left[0] + bottom_right[0]) / 2
-                y_center = (top_left[1] + bottom_right[1]) / 2
-                width = abs(bottom_right[0] - top_left[0])
-                height = abs(bottom_right[1] - top_left[1])
-                
-                text_blocks.append({
-                    'text': text.strip(),
-                    'confidence': confidence,
-                    'position': {
-                        'x': x_center,
-                        'y': y_center,
-                        'width': width,
-                        'height': height
-                    },
-                    'bbox': {
-                        'top_left': [top_left[0], top_left[1]],
-                        'top_right': [bbox[1][0], bbox[1][1]],
-                        'bottom_right': [bottom_right[0], bottom_right[1]],
-                        'bottom_left': [bbox[3][0], bbox[3][1]]
-                    }
-                })
-                confidences.append(confidence)
-        
-        # Sort and group into lines
-        text_blocks.sort(key=lambda block: (block['position']['y'], block['position']['x']))
-        
-        lines = []
-        current_line = []
-        line_threshold = 20
-        
-        for block in text_blocks:
-            if not current_line:
-                current_line = [block]
-            else:
-                avg_y = sum(b['position']['y'] for b in current_line) / len(current_line)
-                if abs(block['position']['y'] - avg_y) <= line_threshold:
-                    current_line.append(block)
-                else:
-                    if current_line:
-                        current_line.sort(key=lambda b: b['position']['x'])
-                        lines.append(current_line)
-                    current_line = [block]
-        
-        if current_line:
-            current_line.sort(key=lambda b: b['position']['x'])
-            lines.append(current_line)
-        
-        # Create line information
-        line_info = []
-        for i, line in enumerate(lines):
-            line_text = ' '.join(block['text'] for block in line)
-            line_bbox = {
-                'min_x': min(block['bbox']['top_left'][0] for block in line),
-                'min_y': min(block['bbox']['top_left'][1] for block in line),
-                'max_x': max(block['bbox']['bottom_right'][0] for block in line),
-                'max_y': max(block['bbox']['bottom_right'][1] for block in line)
-            }
-            line_info.append({
-                'line_number': i + 1,
-                'text': line_text.strip(),
-                'blocks': line,
-                'bbox': line_bbox,
-                'confidence': sum(block['confidence'] for block in line) / len(line)
-            })
-        
-        # Create final text
-        full_text = '\n'.join(line['text'] for line in line_info)
-        avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
-        
-        detailed_result = {
-            "text": full_text,
-            "lines": line_info,
-            "blocks": text_blocks,
-            "image_size": {"width": image.width, "height": image.height},
-            "confidence": avg_confidence,
-            "total_blocks": len(text_blocks),
-            "total_lines": len(lines)
-        }
-        
-        logger.info(f"Detailed extraction: {len(text_blocks)} blocks in {len(lines)} lines")
-        
-        return detailed_result, True
+        return _positions_from_ocr_results(results, width, height)
         
     except Exception as e:
         logger.error(f"Error in detailed text extraction: {str(e)}")
@@ -399,15 +746,10 @@ def extract_text_from_image(image_bytes: bytes) -> Tuple[str, bool]:
         Tuple of (extracted_text, success_flag)
     """
     try:
-        # Open image from bytes
-        image = Image.open(io.BytesIO(image_bytes))
-        logger.info(f"Processing image: {image.size} pixels, mode: {image.mode}")
-        
-        # Preprocess image for EasyOCR
-        processed_image = preprocess_image_for_ocr(image)
+        results, _, _ = _read_image_bytes(image_bytes)
         
         # Extract text with EasyOCR
-        raw_text, confidence = extract_text_with_easyocr(processed_image)
+        raw_text, confidence = _text_from_ocr_results(results)
         
         if not raw_text.strip():
             logger.warning("No text extracted from image")
@@ -426,6 +768,72 @@ def extract_text_from_image(image_bytes: bytes) -> Tuple[str, bool]:
         logger.error(f"Error extracting text from image: {str(e)}")
         return f"Error processing image: {str(e)}", False
 
+def _find_poppler_path() -> Optional[str]:
+    """Return the first common Windows Poppler install directory that exists, or None to use PATH."""
+    candidates = [
+        r"C:\poppler\Library\bin",
+        os.path.expandvars(r"%LOCALAPPDATA%\Microsoft\WinGet\Packages\oschwartz10612.Poppler_Microsoft.Winget.Source_8wekyb3d8bbwe\bin"),
+        r"C:\Program Files\poppler\bin",
+        r"C:\Program Files (x86)\poppler\bin",
+        os.path.expandvars(r"%USERPROFILE%\AppData\Local\Programs\Poppler\bin")
+    ]
+    return next((path for path in candidates if os.path.isdir(path)), None)
+
+# Poppler directory for the pdf2image fallback, probed once at import
+_POPPLER_PATH = _find_poppler_path() if pymupdf is None else None
+
+def _render_pdf_pages(pdf_bytes: bytes) -> Iterator[np.ndarray]:
+    """
+    Rasterize the first PDF_MAX_PAGES pages of a PDF to grayscale numpy arrays at OCR_PDF_DPI.
+    
+    PyMuPDF renders in-process straight into the pixmap buffer, one page at a
+    time as the consumer asks for it. Without it, pdf2image is used, which
+    shells out to Poppler's pdftoppm once per page so that only the page being
+    handed over is held in memory.
+    
+    Args:
+        pdf_bytes: Raw PDF bytes
+        
+    Yields:
+        One (height, width) uint8 array per page
+    """
+    dpi = getattr(settings, 'OCR_PDF_DPI', 150)
+    if pymupdf is not None:
+        with pymupdf.open(stream=pdf_bytes, filetype='pdf') as doc:
+            for page in doc.pages(0, min(doc.page_count, PDF_MAX_PAGES)):
+                # OCR only looks at luminance, so render grayscale directly
+                pix = page.get_pixmap(dpi=dpi, colorspace=pymupdf.csGRAY, alpha=False)
+                yield np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width)
+        return
+    
+    from pdf2image import convert_from_bytes, pdfinfo_from_bytes
+    
+    page_count = pdfinfo_from_bytes(pdf_bytes, poppler_path=_POPPLER_PATH)['Pages']
+    for page_num in range(1, min(page_count, PDF_MAX_PAGES) + 1):
+        try:
+            images = convert_from_bytes(
+                pdf_bytes,
+                dpi=dpi,
+                first_page=page_num,
+                last_page=page_num,
+                grayscale=True,  # OCR only looks at luminance
+                transparent=False,
+                poppler_path=_POPPLER_PATH
+            )
+        except Exception as convert_error:
+            logger.error(f"Error converting PDF page {page_num} to an image: {str(convert_error)}")
+            # Try again with lower DPI
+            images = convert_from_bytes(
+                pdf_bytes,
+                dpi=dpi * 2 // 3,
+                first_page=page_num,
+                last_page=page_num,
+                grayscale=True,
+                poppler_path=_POPPLER_PATH
+            )
+            logger.info(f"Fallback conversion of PDF page {page_num} with lower DPI successful")
+        yield _grayscale_array(images.pop())
+
 def extract_text_from_pdf(pdf_bytes: bytes) -> Tuple[str, bool]:
     """
     Extract text from PDF bytes by converting to images and using EasyOCR.
@@ -438,78 +846,32 @@ def extract_text_from_pdf(pdf_bytes: bytes) -> Tuple[str, bool]:
         Tuple of (extracted_text_with_html, success_flag)
     """
     try:
-        # Import pdf2image for PDF processing
-        from pdf2image import convert_from_bytes
-        import os
-        
         logger.info("Converting PDF to images for OCR processing")
         
-        # Try to add common Poppler installation paths to environment if not found
-        poppler_paths = [
-            r"C:\poppler\Library\bin",  # User's actual Poppler installation
-            os.path.expandvars(r"%LOCALAPPDATA%\Microsoft\WinGet\Packages\oschwartz10612.Poppler_Microsoft.Winget.Source_8wekyb3d8bbwe\bin"),
-            r"C:\Program Files\poppler\bin",
-            r"C:\Program Files (x86)\poppler\bin",
-            os.path.expandvars(r"%USERPROFILE%\AppData\Local\Programs\Poppler\bin")
-        ]
-        
-        current_path = os.environ.get('PATH', '')
-        for poppler_path in poppler_paths:
-            if os.path.exists(poppler_path) and poppler_path not in current_path:
-                os.environ['PATH'] = f"{poppler_path};{current_path}"
-                logger.info(f"Added Poppler path to environment: {poppler_path}")
-                break
-        
-        # Convert PDF pages to images with enhanced settings
+        # Pages are rendered, preprocessed and read as a stream, so only the
+        # pages in flight are held in memory
         try:
-            images = convert_from_bytes(
-                pdf_bytes,
-                dpi=300,  # High DPI for better OCR accuracy
-                first_page=1,
-                last_page=20,  # Increased limit for more pages
-                fmt='PNG',
-                thread_count=2,  # Use multiple threads for faster processing
-                grayscale=False,  # Keep color for better text detection
-                transparent=False
-            )
-        except Exception as convert_error:
-            logger.error(f"Error converting PDF to images: {str(convert_error)}")
-            # Try alternative approach with lower DPI
-            try:
-                images = convert_from_bytes(
-                    pdf_bytes,
-                    dpi=200,  # Lower DPI as fallback
-                    first_page=1,
-                    last_page=10,
-                    fmt='PNG'
-                )
-                logger.info("Fallback PDF conversion with lower DPI successful")
-            except Exception as fallback_error:
-                return f"Error processing PDF: {str(fallback_error)}", False
+            pages = _ocr_pdf_pages(pdf_bytes)
+        except ImportError:
+            raise
+        except Exception as pdf_error:
+            logger.error(f"Error reading PDF pages: {str(pdf_error)}")
+            return f"Error processing PDF: {str(pdf_error)}", False
         
-        if not images:
+        if not pages:
             return "No pages found in PDF.", False
         
-        logger.info(f"Successfully converted PDF to {len(images)} images")
+        logger.info(f"Successfully read {len(pages)} PDF pages")
         
         # Process each page and create TinyMCE-compatible HTML
         page_contents = []
         
-        for page_num, image in enumerate(images, 1):
+        for page_num, (page_results, _, _) in enumerate(pages, 1):
             try:
-                logger.info(f"Processing PDF page {page_num}/{len(images)}")
-                
-                # Convert PIL image to bytes for processing with high quality
-                img_byte_arr = io.BytesIO()
-                image.save(img_byte_arr, format='PNG', optimize=False, quality=95)
-                img_bytes = img_byte_arr.getvalue()
-                
-                # Use the EXACT same OCR processing as Image OCR
-                # Convert PIL image to proper format for EasyOCR (same as Image OCR)
-                processed_image = preprocess_image_for_ocr(image)
+                logger.info(f"Processing PDF page {page_num}/{len(pages)}")
                 
-                # Use the IDENTICAL function as Image OCR for positioning
-                raw_text, confidence = extract_text_with_easyocr(processed_image)
+                # Same preprocessing and line assembly as Image OCR, on the batched results
+                raw_text, confidence = _text_from_ocr_results(page_results)
                 
                 if raw_text.strip():
                     # Apply the same post-processing as Image OCR
@@ -544,8 +906,8 @@ def extract_text_from_pdf(pdf_bytes: bytes) -> Tuple[str, bool]:
         return final_text, True
         
     except ImportError:
-        logger.error("pdf2image not installed. PDF processing not available.")
-        return "PDF processing requires pdf2image package. Please install it with: pip install pdf2image", False
+        logger.error("Neither PyMuPDF nor pdf2image is installed. PDF processing not available.")
+        return "PDF processing requires the PyMuPDF package. Please install it with: pip install PyMuPDF", False
     except Exception as e:
         logger.error(f"Error extracting text from PDF: {str(e)}")
         return f"Error processing PDF: {str(e)}", False
@@ -562,68 +924,31 @@ def extract_text_from_pdf_with_positions(pdf_bytes: bytes) -> Tuple[dict, bool]:
         Tuple of (detailed_result_dict, success_flag)
     """
     try:
-        # Import pdf2image for PDF processing
-        from pdf2image import convert_from_bytes
-        import os
-        
         logger.info("Converting PDF to images for detailed positioning OCR")
         
-        # Try to add common Poppler installation paths to environment if not found
-        poppler_paths = [
-            r"C:\poppler\Library\bin",  # User's actual Poppler installation
-            os.path.expandvars(r"%LOCALAPPDATA%\Microsoft\WinGet\Packages\oschwartz10612.Poppler_Microsoft.Winget.Source_8wekyb3d8bbwe\bin"),
-            r"C:\Program Files\poppler\bin",
-            r"C:\Program Files (x86)\poppler\bin",
-            os.path.expandvars(r"%USERPROFILE%\AppData\Local\Programs\Poppler\bin")
-        ]
-        
-        current_path = os.environ.get('PATH', '')
-        for poppler_path in poppler_paths:
-            if os.path.exists(poppler_path) and poppler_path not in current_path:
-                os.environ['PATH'] = f"{poppler_path};{current_path}"
-                logger.info(f"Added Poppler path to environment: {poppler_path}")
-                break
-        
-        # Convert PDF pages to images with enhanced settings
+        # Pages are rendered, preprocessed and read as a stream, so only the
+        # pages in flight are held in memory
         try:
-            images = convert_from_bytes(
-                pdf_bytes,
-                dpi=300,  # High DPI for better OCR accuracy
-                first_page=1,
-                last_page=20,  # Increased limit for more pages
-                fmt='PNG',
-                thread_count=2,  # Use multiple threads for faster processing
-                grayscale=False,  # Keep color for better text detection
-                transparent=False
-            )
-        except Exception as convert_error:
-            logger.error(f"Error converting PDF to images: {str(convert_error)}")
-            # Try alternative approach with lower DPI
-            try:
-                images = convert_from_bytes(
-                    pdf_bytes,
-                    dpi=200,  # Lower DPI as fallback
-                    first_page=1,
-                    last_page=10,
-                    fmt='PNG'
-                )
-                logger.info("Fallback PDF conversion with lower DPI successful")
-            except Exception as fallback_error:
-                return {
-                    "text": f"Error processing PDF: {str(fallback_error)}",
-                    "lines": [],
-                    "blocks": [],
-                    "image_size": {"width": 0, "height": 0},
-                    "confidence": 0.0,
-                    "total_blocks": 0,
-                    "total_lines": 0,
-                    "pdf_pages": 0,
-                    "pages": [],
-                    "is_pdf": True,
-                    "strict_pages": True
-                }, False
-        
-        if not images:
+            pages = _ocr_pdf_pages(pdf_bytes)
+        except ImportError:
+            raise
+        except Exception as pdf_error:
+            logger.error(f"Error reading PDF pages: {str(pdf_error)}")
+            return {
+                "text": f"Error processing PDF: {str(pdf_error)}",
+                "lines": [],
+                "blocks": [],
+                "image_size": {"width": 0, "height": 0},
+                "confidence": 0.0,
+                "total_blocks": 0,
+                "total_lines": 0,
+                "pdf_pages": 0,
+                "pages": [],
+                "is_pdf": True,
+                "strict_pages": True
+            }, False
+        
+        if not pages:
             return {
                 "text": "No pages found in PDF.",
                 "lines": [],
@@ -635,7 +960,7 @@ def extract_text_from_pdf_with_positions(pdf_bytes: bytes) -> Tuple[dict, bool]:
                 "pdf_pages": 0
             }, False
         
-        logger.info(f"Successfully converted PDF to {len(images)} images for detailed positioning")
+        logger.info(f"Successfully read {len(pages)} PDF pages for detailed positioning")
         
         # Process each PDF page as SEPARATE pages (not combined)
         pdf_pages_data = []
@@ -645,17 +970,12 @@ def extract_text_from_pdf_with_positions(pdf_bytes: bytes) -> Tuple[dict, bool]:
         total_blocks = 0
         total_lines = 0
         
-        for page_num, image in enumerate(images, 1):
+        for page_num, (page_results, page_width, page_height) in enumerate(pages, 1):
             try:
-                logger.info(f"Processing PDF page {page_num}/{len(images)} as separate page")
-                
-                # Convert PIL image to bytes for processing with high quality
-                img_byte_arr = io.BytesIO()
-                image.save(img_byte_arr, format='PNG', optimize=False, quality=95)
-                img_bytes = img_byte_arr.getvalue()
+                logger.info(f"Processing PDF page {page_num}/{len(pages)} as separate page")
                 
-                # Use EXACT same function as Image OCR for positioning
-                page_result, page_success = extract_text_with_positions(img_bytes)
+                # Same positioning as Image OCR, on the rendered page size and its batched results
+                page_result, page_success = _positions_from_ocr_results(page_results, page_width, page_height)
                 
                 if page_success and page_result.get('text', '').strip():
                     page_lines = page_result.get('lines', [])
@@ -731,7 +1051,7 @@ def extract_text_from_pdf_with_positions(pdf_bytes: bytes) -> Tuple[dict, bool]:
                 "confidence": 0.0,
                 "total_blocks": 0,
                 "total_lines": 0,
-                "pdf_pages": len(images),
+                "pdf_pages": len(pages),
                 "pages": [],
                 "is_pdf": True,
                 "strict_pages": True
@@ -753,20 +1073,20 @@ def extract_text_from_pdf_with_positions(pdf_bytes: bytes) -> Tuple[dict, bool]:
             "confidence": avg_confidence,
             "total_blocks": total_blocks,
             "total_lines": total_lines,
-            "pdf_pages": len(images),
+            "pdf_pages": len(pages),
             "pages": pdf_pages_data,  # Array of separate page data
             "is_pdf": True,  # Flag to indicate PDF source - disables overflow logic
             "strict_pages": True  # Flag to enforce 1:1 page correspondence
         }
         
-        logger.info(f"PDF positioning OCR complete: {total_blocks} total blocks, {total_lines} total lines, {len(images)} pages, avg confidence: {avg_confidence:.2f}")
+        logger.info(f"PDF positioning OCR complete: {total_blocks} total blocks, {total_lines} total lines, {len(pages)} pages, avg confidence: {avg_confidence:.2f}")
         
         return detailed_result, True
         
     except ImportError:
-        logger.error("pdf2image not installed. PDF positioning processing not available.")
+        logger.error("Neither PyMuPDF nor pdf2image is installed. PDF positioning processing not available.")
         return {
-            "text": "PDF processing requires pdf2image package. Please install it with: pip install pdf2image",
+            "text": "PDF processing requires the PyMuPDF package. Please install it with: pip install PyMuPDF",
             "lines": [],
             "blocks": [],
             "image_size": {"width": 0, "height": 0},
@@ -807,8 +1127,7 @@ def extract_text_from_file(file_bytes: bytes, filename: str) -> Tuple[str, bool]
     """
     try:
         # Get file extension
-        file_ext = filename.lower().split('.')[-1] if '.' in filename else ''
-        file_ext = f'.{file_ext}'
+        file_ext = os.path.splitext(filename)[1].lower()
         
         # Validate file type
         if file_ext not in ALL_SUPPORTED_EXTENSIONS:
@@ -855,11 +1174,10 @@ def is_supported_file_type(filename: str) -> bool:
     Returns:
         True if supported, False otherwise
     """
-    if not filename or '.' not in filename:
+    if not filename:
         return False
-        
-    file_ext = f".{filename.lower().split('.')[-1]}"
-    return file_ext in ALL_SUPPORTED_EXTENSIONS
+    
+    return os.path.splitext(filename)[1].lower() in ALL_SUPPORTED_EXTENSIONS
 
 def get_supported_languages() -> List[str]:
     """
@@ -868,20 +1186,7 @@ def get_supported_languages() -> List[str]:
     Returns:
         List of supported language codes
     """
-    try:
-        # EasyOCR supported languages (as of version 1.7+)
-        supported_languages = [
-            'en', 'ch_sim', 'ch_tra', 'ja', 'ko', 'th', 'vi', 'ar', 'bg', 'cs', 'da', 'de', 
-            'el', 'es', 'et', 'fi', 'fr', 'hr', 'hu', 'id', 'it', 'lt', 'lv', 'mt', 'nl', 
-            'no', 'pl', 'pt', 'ro', 'ru', 'sk', 'sl', 'sq', 'sv', 'tr', 'uk', 'bn', 'gu', 
-            'hi', 'kn', 'ml', 'mr', 'ne', 'or', 'pa', 'sa', 'ta', 'te', 'ur', 'fa', 'he', 
-            'my', 'ka', 'ky', 'mn', 'am', 'az', 'be', 'cy', 'eu', 'ga', 'gl', 'is', 'la', 
-            'lb', 'mk', 'ms', 'sw', 'tl', 'yo', 'zu'
-        ]
-        return supported_languages
-    except Exception as e:
-        logger.error(f"Error getting supported languages: {str(e)}")
-        return ['en']  # Default to English
+    return list(_SUPPORTED_LANGUAGES)
 
 def get_ocr_info() -> dict:
     """
@@ -891,17 +1196,15 @@ def get_ocr_info() -> dict:
         Dictionary with OCR system information
     """
     try:
-        languages = getattr(settings, 'EASYOCR_LANGUAGES', ['en'])
-        use_gpu = getattr(settings, 'EASYOCR_GPU', False)
-        supported_langs = get_supported_languages()
-        
         return {
             'ocr_engine': 'EasyOCR',
             'version': easyocr.__version__ if hasattr(easyocr, '__version__') else 'Unknown',
-            'configured_languages': languages,
-            'gpu_enabled': use_gpu,
-            'supported_languages': supported_langs[:10],  # Show first 10 for brevity
-            'total_supported_languages': len(supported_langs),
+            'configured_languages': EASYOCR_LANGUAGES,
+            'gpu_enabled': EASYOCR_GPU,
+            'precision': getattr(settings, 'EASYOCR_PRECISION', 'int8'),
+            'backend': getattr(settings, 'EASYOCR_BACKEND', 'torch'),
+            'supported_languages': list(_SUPPORTED_LANGUAGES[:10]),  # Show first 10 for brevity
+            'total_supported_languages': len(_SUPPORTED_LANGUAGES),
             'supported_image_formats': list(SUPPORTED_IMAGE_EXTENSIONS),
             'supported_document_formats': list(SUPPORTED_PDF_EXTENSIONS),
             'max_file_size_mb': 10
@@ -2,14 +2,41 @@
 QR Code generation utilities for document management system.
 """
 
-import qrcode
-from io import BytesIO
-from PIL import Image
+import cv2
+import numpy as np
+import segno
+from functools import lru_cache
 from ..models import QRLink
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Document QR PNGs kept in memory, keyed by the URL they encode
+QR_CODE_CACHE_SIZE = 1024
+
+# Modules are pure black/white: store 1 bit per pixel and spend little on zlib
+_QR_PNG_PARAMS = [cv2.IMWRITE_PNG_BILEVEL, 1, cv2.IMWRITE_PNG_COMPRESSION, 1]
+
+def _fit_qr_pixels(pixels, size):
+    """
+    Bring a rendered QR code to the requested size without resampling its modules.
+
+    Args:
+        pixels (numpy.ndarray): The rendered QR code, one uint8 per pixel
+        size (tuple): Target size (width, height)
+
+    Returns:
+        numpy.ndarray: The code centred on a white canvas of the target size
+    """
+    height, width = pixels.shape
+    if (width, height) == tuple(size):
+        return pixels
+    if width > size[0] or height > size[1]:
+        # Too many modules for one pixel each: shrink, keeping edges hard
+        return cv2.resize(pixels, tuple(size), interpolation=cv2.INTER_NEAREST)
+    top, left = (size[1] - height) // 2, (size[0] - width) // 2
+    return np.pad(pixels, ((top, size[1] - height - top), (left, size[0] - width - left)), constant_values=255)
+
 def generate_qr_code(data, size=(300, 300), border=4):
     """
     Generate a QR code image from the given data.
@@ -26,29 +53,33 @@ def generate_qr_code(data, size=(300, 300), border=4):
         Exception: If QR code generation fails
     """
     try:
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=border,
-        )
+        qr = segno.make(data, error='l', boost_error=False, micro=False)
 
-        qr.add_data(data)
-        qr.make(fit=True)
+        # segno's matrix holds 1 for dark modules and 0 for light ones
+        matrix = np.frombuffer(b''.join(qr.matrix), dtype=np.uint8).reshape(len(qr.matrix), -1)
 
-        qr_image = qr.make_image(fill_color="black", back_color="white")
+        # Pick the largest module scale that fits, so the render needs no resampling
+        scale = max(1, min(size) // (matrix.shape[0] + 2 * border))
 
-        if size != qr_image.size:
-            qr_image = qr_image.resize(size, Image.Resampling.LANCZOS)
+        pixels = (1 - matrix) * np.uint8(255)
+        pixels = pixels.repeat(scale, axis=0).repeat(scale, axis=1)
+        pixels = np.pad(pixels, border * scale, constant_values=255)
+        pixels = _fit_qr_pixels(pixels, size)
 
-        buffer = BytesIO()
-        qr_image.save(buffer, format='PNG')
-        return buffer.getvalue()
+        ok, png = cv2.imencode('.png', pixels, _QR_PNG_PARAMS)
+        if not ok:
+            raise ValueError("PNG encoding failed")
+        return png.tobytes()
 
     except Exception as e:
         logger.error(f"Error generating QR code: {str(e)}")
         raise Exception(f"QR code generation failed: {str(e)}")
 
+@lru_cache(maxsize=QR_CODE_CACHE_SIZE)
+def _document_qr_png(document_url):
+    """PNG for a document URL; the bytes depend on nothing else, so entries never go stale."""
+    return generate_qr_code(data=document_url, size=(300, 300), border=4)
+
 def generate_document_qr_code(document_id, base_url=None):
     """
     Generate a QR code for a specific document.
@@ -65,15 +96,15 @@ def generate_document_qr_code(document_id, base_url=None):
         if not base_url:
             base_url = getattr(django_settings, 'BASE_URL', 'http://localhost:8000')
 
-        qr = QRLink.objects.filter(document_id=document_id, active=True).order_by('-created_at').first()
-        if qr:
-            document_url = f"{base_url}/api/qr/resolve/{qr.code}/"
+        code = QRLink.objects.filter(document_id=document_id, active=True).order_by('-created_at').values_list('code', flat=True).first()
+        if code:
+            document_url = f"{base_url}/api/qr/resolve/{code}/"
         else:
             document_url = f"{base_url}/api/documents/{document_id}/"
 
         logger.info(f"Generating QR code for document {document_id} with URL: {document_url}")
 
-        qr_data = generate_qr_code(data=document_url, size=(300, 300), border=4)
+        qr_data = _document_qr_png(document_url)
 
         logger.info(f"Successfully generated QR code for document {document_id}")
         return qr_data
@@ -113,7 +144,7 @@ def get_qr_code_info():
     Get information about QR code generation capabilities.
     """
     return {
-        "qr_code_generator": "qrcode library",
+        "qr_code_generator": "segno library",
         "storage": "PostgreSQL binary field (Neon cloud DB)",
         "supported_formats": ["PNG"],
         "default_size": "300x300 pixels",
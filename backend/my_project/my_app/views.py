@@ -13,20 +13,22 @@ from django.shortcuts import get_object_or_404
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
-from .models import Document, QRLink, ACL, Attachment, Label, Collection, DocumentLabel, DocumentCollection, ShareLink, DocumentVersion, AuditLog, Action, UserProfile, GroupOwnership, Notification, NotificationType, ApprovalStatus
+from .models import DOCUMENT_LARGE_FIELDS, Document, QRLink, ACL, Attachment, Label, Collection, DocumentLabel, DocumentCollection, ShareLink, DocumentVersion, AuditLog, Action, UserProfile, GroupOwnership, Notification, NotificationType, ApprovalStatus
 from django.contrib.auth.models import Group
 from .serializers import (
     OCRUploadSerializer, OCRResponseSerializer, OCRErrorSerializer,
     DocumentSerializer, DocumentListSerializer, DocumentCreateSerializer, QRCodeSerializer,
     GroupSerializer, UserGroupSerializer, GroupMembershipSerializer,
-    ShareLinkSerializer, ShareLinkCreateSerializer, ACLSerializer,
-    DocumentVersionSerializer, DocumentVersionListSerializer, AuditLogSerializer, DocumentRestoreSerializer
+    ShareLinkSerializer, ShareLinkCreateSerializer, ACLSerializer, build_acl_subject_map,
+    DocumentVersionSerializer, DocumentVersionListSerializer, AuditLogSerializer, DocumentRestoreSerializer,
+    CONTENT_PREVIEW_LENGTH,
 )
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django.contrib.auth import authenticate, login, logout
 from rest_framework.authtoken.models import Token
 from rest_framework.authentication import TokenAuthentication
-from django.db.models import Q, F
+from django.db.models import Q, F, Count
+from django.db.models.functions import Substr
 from rest_framework.decorators import authentication_classes, permission_classes
 from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
@@ -42,6 +44,9 @@ from .utils.qrcode_generator import update_document_qr_code, get_qr_code_info
 
 logger = logging.getLogger(__name__)
 
+# Defer the large Document columns when a document is only joined for its title
+DOCUMENT_RELATION_DEFER = tuple(f'document__{name}' for name in DOCUMENT_LARGE_FIELDS)
+
 @swagger_auto_schema(
     method='post',
     operation_description="Extract text from uploaded image or PDF file using OCR",
@@ -436,8 +441,8 @@ class DocumentListCreateView(generics.ListCreateAPIView):
             return Document.objects.none()
         user = self.request.user
 
-        # Base queryset with select_related for owner
-        base_qs = Document.objects.select_related('owner').prefetch_related('attachments')
+        # Base queryset with the owner and per-row relations preloaded
+        base_qs = Document.objects.for_listing().with_related()
 
         # Admin users see all documents, with optional owner filter
         if user.is_staff or user.is_superuser:
@@ -447,19 +452,9 @@ class DocumentListCreateView(generics.ListCreateAPIView):
                 qs = qs.filter(owner__username__icontains=owner_filter)
             return qs.order_by('-created_at')
 
-        # Get direct user ACLs
-        user_acls = ACL.objects.filter(
-            subject_type='user',
-            subject_id=str(user.id)
-        ).filter(
-            Q(expires_at__isnull=True) | Q(expires_at__gt=timezone.now())
-        ).values_list('document_id', flat=True)
-
-        # Get group ACLs
-        user_groups = user.groups.values_list('id', flat=True)
-        group_acls = ACL.objects.filter(
-            subject_type='group',
-            subject_id__in=[str(group_id) for group_id in user_groups]
+        # Get direct user and group ACLs via the typed subject columns
+        acl_doc_ids = ACL.objects.filter(
+            Q(subject_user=user) | Q(subject_group__in=user.groups.all())
         ).filter(
             Q(expires_at__isnull=True) | Q(expires_at__gt=timezone.now())
         ).values_list('document_id', flat=True)
@@ -467,8 +462,7 @@ class DocumentListCreateView(generics.ListCreateAPIView):
         # Combine owned documents with ACL-granted access
         return base_qs.filter(
             Q(owner=user) |
-            Q(id__in=user_acls) |
-            Q(id__in=group_acls)
+            Q(id__in=acl_doc_ids)
         ).order_by('-created_at').distinct()
     parser_classes = [MultiPartParser, FormParser]
 
@@ -617,30 +611,19 @@ class DocumentDetailView(generics.RetrieveUpdateDestroyAPIView):
         
         # Admin users see all documents
         if user.is_staff or user.is_superuser:
-            return Document.objects.all()
+            return Document.objects.select_related('owner')
         
-        # Get direct user ACLs
-        user_acls = ACL.objects.filter(
-            subject_type='user', 
-            subject_id=str(user.id)
-        ).filter(
-            Q(expires_at__isnull=True) | Q(expires_at__gt=timezone.now())
-        ).values_list('document_id', flat=True)
-        
-        # Get group ACLs
-        user_groups = user.groups.values_list('id', flat=True)
-        group_acls = ACL.objects.filter(
-            subject_type='group',
-            subject_id__in=[str(group_id) for group_id in user_groups]
+        # Get direct user and group ACLs via the typed subject columns
+        acl_doc_ids = ACL.objects.filter(
+            Q(subject_user=user) | Q(subject_group__in=user.groups.all())
         ).filter(
             Q(expires_at__isnull=True) | Q(expires_at__gt=timezone.now())
         ).values_list('document_id', flat=True)
         
         # Combine owned documents with ACL-granted access
-        return Document.objects.filter(
+        return Document.objects.select_related('owner').filter(
             Q(owner=user) | 
-            Q(id__in=user_acls) | 
-            Q(id__in=group_acls)
+            Q(id__in=acl_doc_ids)
         ).distinct()
     
     @swagger_auto_schema(
@@ -888,8 +871,8 @@ def register(request):
     profile.email_verification_expires = timezone.now() + timezone.timedelta(minutes=15)
     profile.save()
 
-    # Send verification email
-    send_verification_email(user, code)
+    # Queue the verification email; delivery happens after the response
+    email_queued = send_verification_email(user, code)
 
     # Notify admins of new registration
     try:
@@ -904,6 +887,7 @@ def register(request):
         'email': user.email,
         'token': token.key,
         'needs_verification': True,
+        'verification_email_queued': email_queued,
         'approval_status': profile.approval_status,
     }, status=201)
 
@@ -1067,8 +1051,9 @@ def resend_verification(request):
     profile.email_verification_expires = timezone.now() + timezone.timedelta(minutes=15)
     profile.save(update_fields=['email_verification_code', 'email_verification_expires'])
 
-    send_verification_email(request.user, code)
-    return Response({'message': 'Verification code resent'}, status=200)
+    if not send_verification_email(request.user, code):
+        logger.warning(f"Verification email to {request.user.email} was not queued")
+    return Response({'message': 'Verification code queued for sending'}, status=200)
 
 
 @swagger_auto_schema(method='get', tags=['Auth'])
@@ -1243,7 +1228,7 @@ def document_share_create(request, pk: int):
     
     # Check if user can share this document using enhanced permissions
     from .permissions import user_can_perform_action, Action
-    if not user_can_perform_action(request.user, document, Action.SHARE):
+    if not user_can_perform_action(request.user, document, Action.SHARE, request=request):
         return Response({'error': 'You do not have permission to share this document'}, status=403)
     
     subject_type = request.data.get('subject_type') or request.data.get('subjectType')
@@ -1254,51 +1239,47 @@ def document_share_create(request, pk: int):
     if not all([subject_type, subject_id, role]):
         return Response({'error': 'subject_type, subject_id, and role are required'}, status=400)
     
+    if subject_type not in ('user', 'group'):
+        return Response({'error': 'subject_type must be "user" or "group"'}, status=400)
+    try:
+        subject_id = int(subject_id)
+    except (TypeError, ValueError):
+        return Response({'error': 'subject_id must be an integer id'}, status=400)
+    
     # Validate subject exists
     if subject_type == 'user':
-        try:
-            from django.contrib.auth import get_user_model
-            User = get_user_model()
-            User.objects.get(id=subject_id)
-        except User.DoesNotExist:
+        from django.contrib.auth import get_user_model
+        User = get_user_model()
+        subject = User.objects.filter(id=subject_id).first()
+        if subject is None:
             return Response({'error': 'User not found'}, status=400)
-    elif subject_type == 'group':
-        try:
-            Group.objects.get(id=subject_id)
-        except Group.DoesNotExist:
-            return Response({'error': 'Group not found'}, status=400)
+        subject_lookup = {'subject_user': subject}
     else:
-        return Response({'error': 'subject_type must be "user" or "group"'}, status=400)
+        subject = Group.objects.filter(id=subject_id).first()
+        if subject is None:
+            return Response({'error': 'Group not found'}, status=400)
+        subject_lookup = {'subject_group': subject}
     
     try:
-        # Create or update ACL entry
+        # Create or update ACL entry, matched on the typed subject column
         acl, created = ACL.objects.update_or_create(
             document=document,
             subject_type=subject_type,
-            subject_id=str(subject_id),
+            **subject_lookup,
             defaults={
                 'role': role,
                 'expires_at': expires_at,
                 'created_by': request.user
             }
         )
+        # Updated rows come back without their document; reuse the loaded one
+        acl.document = document
         
         # Log the sharing action
-        shared_with_name = None
         if subject_type == 'user':
-            try:
-                from django.contrib.auth import get_user_model
-                User = get_user_model()
-                user = User.objects.get(id=subject_id)
-                shared_with_name = user.email or user.username
-            except:
-                shared_with_name = f"User #{subject_id}"
-        elif subject_type == 'group':
-            try:
-                group = Group.objects.get(id=subject_id)
-                shared_with_name = group.name
-            except:
-                shared_with_name = f"Group #{subject_id}"
+            shared_with_name = subject.email or subject.username
+        else:
+            shared_with_name = subject.name
         
         log_document_share(request, document, shared_with=shared_with_name, role=role)
 
@@ -1361,7 +1342,7 @@ def document_shares_list(request, pk: int):
 def share_update_delete(request, share_id: str):
     if not request.user or not request.user.is_authenticated:
         return Response({'error': 'auth required'}, status=401)
-    acl = get_object_or_404(ACL, id=share_id)
+    acl = get_object_or_404(ACL.objects.select_related('document').defer(*DOCUMENT_RELATION_DEFER), id=share_id)
     document = acl.document
     if document.owner_id != request.user.id and not (request.user.is_staff or request.user.is_superuser):
         return Response({'error': 'forbidden'}, status=403)
@@ -1653,19 +1634,9 @@ def _permission_filter_queryset(request):
     if user.is_staff or user.is_superuser:
         return Document.objects.all()
     
-    # Get direct user ACLs
-    user_acls = ACL.objects.filter(
-        subject_type='user', 
-        subject_id=str(user.id)
-    ).filter(
-        Q(expires_at__isnull=True) | Q(expires_at__gt=timezone.now())
-    ).values_list('document_id', flat=True)
-    
-    # Get group ACLs
-    user_groups = user.groups.values_list('id', flat=True)
-    group_acls = ACL.objects.filter(
-        subject_type='group',
-        subject_id__in=[str(group_id) for group_id in user_groups]
+    # Get direct user and group ACLs via the typed subject columns
+    acl_doc_ids = ACL.objects.filter(
+        Q(subject_user=user) | Q(subject_group__in=user.groups.all())
     ).filter(
         Q(expires_at__isnull=True) | Q(expires_at__gt=timezone.now())
     ).values_list('document_id', flat=True)
@@ -1673,8 +1644,7 @@ def _permission_filter_queryset(request):
     # Combine owned documents with ACL-granted access
     return Document.objects.filter(
         Q(owner=user) | 
-        Q(id__in=user_acls) | 
-        Q(id__in=group_acls)
+        Q(id__in=acl_doc_ids)
     ).distinct()
 
 
@@ -1698,7 +1668,7 @@ def search_standard(request):
     if label_ids:
         qs = qs.filter(documentlabel__label_id__in=label_ids).distinct()
     # Optimize with select_related and use lighter serializer
-    qs = qs.select_related('owner').prefetch_related('attachments').order_by('-updated_at')[:50]  # Limit results
+    qs = qs.for_listing().with_related().order_by('-updated_at')[:50]  # Limit results
     data = DocumentListSerializer(qs, many=True, context={'request': request}).data
     return Response(data, status=200)
 
@@ -1716,25 +1686,15 @@ def search_deep(request):
     q = request.GET.get('q', '').strip()
     if not q:
         return Response({'error': 'q required'}, status=400)
-    try:
-        from django.db import connection
-        if connection.vendor == 'postgresql':
-            try:
-                query = SearchQuery(q, config='english')
-                qs2 = qs.filter(search_tsv__search=query)
-                if not qs2.exists():
-                    qs2 = qs.filter(search_tsv__search=q)
-                qs = qs2.order_by('-updated_at')
-            except Exception as e:
-                logger.warning(f"FTS search fallback due to error: {e}")
-                qs = qs.filter(text__icontains=q).order_by('-updated_at')
-        else:
-            qs = qs.filter(text__icontains=q).order_by('-updated_at')
-    except Exception as e:
-        logger.error(f"Deep search error: {e}")
-        qs = qs.filter(text__icontains=q).order_by('-updated_at')
+    from django.db import connection
+    if connection.vendor == 'postgresql':
+        # search_tsv @@ plainto_tsquery(...), served by the search_tsv GIN index
+        qs = qs.filter(search_tsv=SearchQuery(q, config='english'))
+    else:
+        qs = qs.filter(text__icontains=q)
+    qs = qs.order_by('-updated_at')
     # Optimize and limit results
-    qs = qs.select_related('owner').prefetch_related('attachments')[:50]
+    qs = qs.for_listing().with_related()[:50]
     data = DocumentListSerializer(qs, many=True, context={'request': request}).data
     return Response(data, status=200)
 
@@ -1861,6 +1821,8 @@ def groups_list_create(request):
             owned_group_ids = GroupOwnership.objects.filter(owner=request.user).values_list('group_id', flat=True)
             groups = Group.objects.filter(id__in=owned_group_ids)
 
+        # Count members in the same query instead of once per group
+        groups = groups.annotate(member_count_agg=Count('user'))
         serializer = GroupSerializer(groups, many=True, context={'request': request})
         return Response(serializer.data)
     
@@ -2046,7 +2008,7 @@ def document_share_links(request, document_id):
     
     # Check if user can share this document
     from .permissions import user_can_perform_action, Action
-    if not user_can_perform_action(request.user, document, Action.SHARE):
+    if not user_can_perform_action(request.user, document, Action.SHARE, request=request):
         return Response({'error': 'You do not have permission to share this document'}, 
                        status=status.HTTP_403_FORBIDDEN)
     
@@ -2094,7 +2056,7 @@ def share_link_revoke(request, share_link_id):
     
     # Check if user can revoke this share link
     from .permissions import user_can_perform_action, Action
-    if not user_can_perform_action(request.user, share_link.document, Action.SHARE):
+    if not user_can_perform_action(request.user, share_link.document, Action.SHARE, request=request):
         return Response({'error': 'You do not have permission to revoke this share link'}, 
                        status=status.HTTP_403_FORBIDDEN)
     
@@ -2231,7 +2193,14 @@ def document_version_history(request, document_id):
             return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
         
         # Get versions ordered by version number (newest first)
-        versions = DocumentVersion.objects.filter(document=document).order_by('-version_no')
+        # Only a short text preview is rendered, so never load full html/text
+        versions = (
+            DocumentVersion.objects.filter(document=document)
+            .select_related('author')
+            .only('id', 'version_no', 'change_note', 'created_at', 'author__username', 'author__email')
+            .annotate(text_preview=Substr('text', 1, CONTENT_PREVIEW_LENGTH + 1))
+            .order_by('-version_no')
+        )
         serializer = DocumentVersionListSerializer(versions, many=True)
         
         # Log this version history view
@@ -2313,7 +2282,7 @@ def document_restore_version(request, document_id):
             return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
         
         # Additional check for EDIT permission specifically
-        if not user_can_perform_action(request.user, document, Action.EDIT):
+        if not user_can_perform_action(request.user, document, Action.EDIT, request=request):
             return Response({'error': 'Edit permission required to restore versions'}, status=status.HTTP_403_FORBIDDEN)
         
         # Validate request data
@@ -2390,22 +2359,22 @@ def group_documents(request, group_id):
     
     # Get all documents shared with this group via ACL
     group_acls = ACL.objects.filter(
-        subject_type='group',
-        subject_id=str(group_id)
+        subject_group_id=group_id
     ).filter(
         Q(expires_at__isnull=True) | Q(expires_at__gt=timezone.now())
-    ).select_related('document')
+    )
     
-    # Get unique documents
-    document_ids = group_acls.values_list('document_id', flat=True).distinct()
-    documents = Document.objects.filter(id__in=document_ids).order_by('-updated_at')
+    # Role of each shared document, read in the same pass as the ids (first ACL wins)
+    group_roles = {}
+    for document_id, role in group_acls.order_by().values_list('document_id', 'role'):
+        group_roles.setdefault(document_id, role)
+    documents = Document.objects.for_listing().with_related().filter(id__in=group_roles).order_by('-updated_at')
     
     # Create response with role info
     result = []
     for doc in documents:
-        doc_acl = group_acls.filter(document=doc).first()
         doc_data = DocumentListSerializer(doc, context={'request': request}).data
-        doc_data['group_role'] = doc_acl.role if doc_acl else None
+        doc_data['group_role'] = group_roles.get(doc.pk)
         result.append(doc_data)
     
     return Response(result)
@@ -2426,15 +2395,19 @@ def groups_with_documents(request):
     # All users see only groups they belong to
     groups = request.user.groups.all()
 
+    # Documents shared with each group, counted in one query
+    doc_counts = dict(
+        ACL.objects.filter(subject_group__in=groups)
+        .filter(Q(expires_at__isnull=True) | Q(expires_at__gt=timezone.now()))
+        .order_by()
+        .values('subject_group_id')
+        .annotate(document_count=Count('document_id', distinct=True))
+        .values_list('subject_group_id', 'document_count')
+    )
+
     result = []
     for group in groups:
-        # Count documents shared with this group
-        doc_count = ACL.objects.filter(
-            subject_type='group',
-            subject_id=str(group.id)
-        ).filter(
-            Q(expires_at__isnull=True) | Q(expires_at__gt=timezone.now())
-        ).values('document_id').distinct().count()
+        doc_count = doc_counts.get(group.id, 0)
 
         # Check ownership
         is_owner = False
@@ -2492,36 +2465,23 @@ def document_acl_list_create(request, document_id):
     document = get_object_or_404(Document, id=document_id)
     
     # Check if user has SHARE permission
-    if not user_can_perform_action(request.user, document, Action.SHARE):
+    if not user_can_perform_action(request.user, document, Action.SHARE, request=request):
         return Response({'error': 'Access denied. SHARE permission required.'}, status=status.HTTP_403_FORBIDDEN)
     
     if request.method == 'GET':
-        acls = ACL.objects.filter(document=document)
+        acls = list(ACL.objects.filter(document=document))
         
-        # Enrich with subject names
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-        
-        result = []
-        for acl in acls:
-            acl_data = ACLSerializer(acl).data
-            
+        # Enrich with subject names, resolving all subjects up front
+        subject_map = build_acl_subject_map(acls)
+        result = ACLSerializer(acls, many=True, context={'subject_map': subject_map}).data
+        for acl, acl_data in zip(acls, result):
+            subject = subject_map.get(acl.subject_type, {}).get(acl.subject_id)
             if acl.subject_type == 'user':
-                try:
-                    user = User.objects.get(id=int(acl.subject_id))
-                    acl_data['subject_name'] = user.email or user.username
-                except (User.DoesNotExist, ValueError):
-                    acl_data['subject_name'] = f"User #{acl.subject_id}"
+                acl_data['subject_name'] = (subject.email or subject.username) if subject else f"User #{acl.subject_id}"
             elif acl.subject_type == 'group':
-                try:
-                    group = Group.objects.get(id=int(acl.subject_id))
-                    acl_data['subject_name'] = group.name
-                except (Group.DoesNotExist, ValueError):
-                    acl_data['subject_name'] = f"Group #{acl.subject_id}"
+                acl_data['subject_name'] = subject.name if subject else f"Group #{acl.subject_id}"
             else:
                 acl_data['subject_name'] = acl.subject_id
-            
-            result.append(acl_data)
         
         return Response(result)
     
@@ -2552,24 +2512,28 @@ def document_acl_list_create(request, document_id):
                 subject_name = user.email or user.username
             except (User.DoesNotExist, ValueError):
                 return Response({'error': f'User with ID {subject_id} not found'}, status=status.HTTP_404_NOT_FOUND)
+            subject_lookup = {'subject_user': user}
         elif subject_type == 'group':
             try:
                 group = Group.objects.get(id=int(subject_id))
                 subject_name = group.name
             except (Group.DoesNotExist, ValueError):
                 return Response({'error': f'Group with ID {subject_id} not found'}, status=status.HTTP_404_NOT_FOUND)
+            subject_lookup = {'subject_group': group}
         
-        # Create or update ACL
+        # Create or update ACL, matched on the typed subject column
         acl, created = ACL.objects.update_or_create(
             document=document,
             subject_type=subject_type,
-            subject_id=str(subject_id),
+            **subject_lookup,
             defaults={
                 'role': role,
                 'expires_at': expires_at,
                 'created_by': request.user
             }
         )
+        # Updated rows come back without their document; reuse the loaded one
+        acl.document = document
         
         # Log the share action
         log_document_share(request, document, shared_with=subject_name, role=role)
@@ -2615,9 +2579,10 @@ def document_acl_detail(request, document_id, acl_id):
     """Update or delete a specific ACL entry."""
     document = get_object_or_404(Document, id=document_id)
     acl = get_object_or_404(ACL, id=acl_id, document=document)
+    acl.document = document
     
     # Check if user has SHARE permission
-    if not user_can_perform_action(request.user, document, Action.SHARE):
+    if not user_can_perform_action(request.user, document, Action.SHARE, request=request):
         return Response({'error': 'Access denied. SHARE permission required.'}, status=status.HTTP_403_FORBIDDEN)
     
     if request.method == 'DELETE':
@@ -2753,15 +2718,13 @@ def group_events_poll(request, group_id):
 
     # Detect new documents shared with this group
     has_new_docs = ACL.objects.filter(
-        subject_type='group',
-        subject_id=str(group_id),
+        subject_group_id=group_id,
         created_at__gt=since_dt
     ).exclude(created_by=request.user).exists()
 
     # Detect share changes or revocations on group documents
     group_doc_ids = ACL.objects.filter(
-        subject_type='group',
-        subject_id=str(group_id)
+        subject_group_id=group_id
     ).values_list('document_id', flat=True)
 
     has_share_changes = AuditLog.objects.filter(
@@ -2771,7 +2734,7 @@ def group_events_poll(request, group_id):
         actor_user=request.user
     ).filter(
         Q(document_id__in=group_doc_ids) |
-        Q(context__revoked_from=f'group:{group_id}')
+        Q(context__contains={'revoked_from': f'group:{group_id}'})
     ).exists()
 
     has_changes = has_new_docs or has_share_changes
@@ -2837,7 +2800,7 @@ def user_groups_events_poll(request):
     # Build Q filter for revocation context matches
     revocation_q = Q()
     for gid in user_group_ids:
-        revocation_q |= Q(context__revoked_from=f'group:{gid}')
+        revocation_q |= Q(context__contains={'revoked_from': f'group:{gid}'})
 
     has_share_changes = AuditLog.objects.filter(
         action=Action.SHARE,
@@ -3091,8 +3054,9 @@ def admin_user_resend_verification(request, user_id):
     profile.email_verification_expires = timezone.now() + timezone.timedelta(minutes=15)
     profile.save(update_fields=['email_verification_code', 'email_verification_expires'])
 
-    send_verification_email(user, code)
-    return Response({'message': f'Verification email resent to {user.email}'})
+    if not send_verification_email(user, code):
+        logger.warning(f"Verification email to {user.email} was not queued")
+    return Response({'message': f'Verification email to {user.email} queued for sending'})
 
 
 @swagger_auto_schema(method='get', tags=['Admin'])
@@ -3105,7 +3069,8 @@ def admin_acl_list(request):
     if denied:
         return denied
 
-    qs = ACL.objects.all().select_related('document', 'created_by').order_by('-created_at')
+    # Only the document title is shown, so skip its large columns
+    qs = ACL.objects.all().select_related('document', 'created_by').defer(*DOCUMENT_RELATION_DEFER).order_by('-created_at')
     document_id = request.query_params.get('document_id')
     user_id = request.query_params.get('user_id')
     subject_type = request.query_params.get('subject_type')
@@ -3115,35 +3080,26 @@ def admin_acl_list(request):
     if document_id:
         qs = qs.filter(document_id=document_id)
     if user_id:
-        qs = qs.filter(subject_type='user', subject_id=str(user_id))
+        # Non-numeric ids match no user, as they did when subject_id was compared as text
+        qs = qs.filter(subject_user_id=user_id) if user_id.isdigit() else qs.none()
     if subject_type:
         qs = qs.filter(subject_type=subject_type)
     if role:
         qs = qs.filter(role=role)
 
-    from django.contrib.auth import get_user_model
-    User = get_user_model()
-
     # Build enriched results first (for search filtering)
-    all_results = []
-    for acl in qs:
-        data = ACLSerializer(acl).data
+    acls = list(qs)
+    subject_map = build_acl_subject_map(acls)
+    all_results = ACLSerializer(acls, many=True, context={'subject_map': subject_map}).data
+    for acl, data in zip(acls, all_results):
         data['document_title'] = acl.document.title if acl.document else None
+        subject = subject_map.get(acl.subject_type, {}).get(acl.subject_id)
         if acl.subject_type == 'user':
-            try:
-                u = User.objects.get(id=int(acl.subject_id))
-                data['subject_name'] = u.username
-            except (User.DoesNotExist, ValueError):
-                data['subject_name'] = f'User #{acl.subject_id}'
+            data['subject_name'] = subject.username if subject else f'User #{acl.subject_id}'
         elif acl.subject_type == 'group':
-            try:
-                g = Group.objects.get(id=int(acl.subject_id))
-                data['subject_name'] = g.name
-            except (Group.DoesNotExist, ValueError):
-                data['subject_name'] = f'Group #{acl.subject_id}'
+            data['subject_name'] = subject.name if subject else f'Group #{acl.subject_id}'
         else:
             data['subject_name'] = acl.subject_id
-        all_results.append(data)
 
     # Apply text search across subject_name and document_title
     if search:
@@ -3190,7 +3146,8 @@ def admin_acl_detail(request, acl_id):
     if denied:
         return denied
 
-    acl = get_object_or_404(ACL, id=acl_id)
+    # Notifications read the document title
+    acl = get_object_or_404(ACL.objects.select_related('document').defer(*DOCUMENT_RELATION_DEFER), id=acl_id)
 
     if request.method == 'DELETE':
         try:
@@ -3263,7 +3220,7 @@ def admin_dashboard_stats(request):
         })
 
     recent_activity = AuditLogSerializer(
-        AuditLog.objects.all().order_by('-ts')[:20],
+        AuditLog.objects.select_related('actor_user', 'document', 'share_link', 'qr_link').defer(*DOCUMENT_RELATION_DEFER).order_by('-ts')[:20],
         many=True
     ).data
 
@@ -165,6 +165,16 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Encode API responses with orjson when drf-orjson-renderer is installed; it
+# serializes datetimes and UUIDs natively instead of via json's default hook.
+# my_app's subclass keeps the output identical to DRF's JSONRenderer (UTC
+# datetimes as 'Z', Decimal as float, ...).
+try:
+    import drf_orjson_renderer  # noqa: F401
+    _JSON_RENDERER = 'my_app.renderers.ORJSONRenderer'
+except ImportError:
+    _JSON_RENDERER = 'rest_framework.renderers.JSONRenderer'
+
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.AllowAny'],
@@ -178,7 +188,7 @@ REST_FRAMEWORK = {
         'rest_framework.parsers.FormParser',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        _JSON_RENDERER,
         'rest_framework.renderers.BrowsableAPIRenderer',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
@@ -236,6 +246,8 @@ CORS_ALLOW_ALL_ORIGINS = DEBUG  # Only in development
 CSRF_TRUSTED_ORIGINS = os.getenv('CSRF_TRUSTED_ORIGINS', 'https://stage-perf.vercel.app').split(',')
 
 # File Upload Settings
+# Keep this at least as large as the 10MB OCR/document upload limit so accepted
+# uploads stay in memory instead of being spooled to a temporary file.
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 
@@ -243,10 +255,49 @@ DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 BREVO_API_KEY = os.getenv('BREVO_API_KEY', '')
 BREVO_SENDER_EMAIL = os.getenv('BREVO_SENDER_EMAIL', 'noreply@stage-perf.com')
 BREVO_SENDER_NAME = os.getenv('BREVO_SENDER_NAME', 'Stage Perf')
+# Send verification emails from a background thread instead of on the request path.
+# Set EMAIL_SEND_ASYNC=False to send synchronously (e.g. when running tests).
+EMAIL_SEND_ASYNC = os.getenv('EMAIL_SEND_ASYNC', 'True').lower() in ('true', '1', 'yes')
 
 # EasyOCR Configuration
 EASYOCR_LANGUAGES = ['en']  # English by default, can add more languages like ['en', 'fr', 'de']
 EASYOCR_GPU = False  # Set to True if you have a compatible GPU and want to use it
+# Load and warm up the OCR models in the background when the WSGI app starts
+EASYOCR_WARMUP = os.getenv('EASYOCR_WARMUP', 'True').lower() in ('true', '1', 'yes')
+# Where the model weights are kept (None = EasyOCR's default ~/.EasyOCR/model).
+# Point this at a baked-in directory and disable downloads to never fetch models at runtime.
+EASYOCR_MODEL_DIR = os.getenv('EASYOCR_MODEL_DIR') or None
+EASYOCR_DOWNLOAD_ENABLED = os.getenv('EASYOCR_DOWNLOAD_ENABLED', 'True').lower() in ('true', '1', 'yes')
+# Inference precision: 'int8' quantizes the models on CPU, 'fp16' autocasts on GPU, 'fp32' uses neither
+EASYOCR_PRECISION = os.getenv('EASYOCR_PRECISION', 'int8').lower()
+# Inference backend on CPU: 'torch' (eager PyTorch) or 'openvino' (torch.compile with the openvino package)
+EASYOCR_BACKEND = os.getenv('EASYOCR_BACKEND', 'torch').lower()
+# Detected text crops recognized per forward pass
+EASYOCR_BATCH_SIZE = int(os.getenv('EASYOCR_BATCH_SIZE', '8'))
+# Resolution PDF pages are rendered at for OCR. 150 DPI keeps body text well
+# within the detector's range at a quarter of the pixels of 300 DPI; raise it
+# for documents with very small print.
+OCR_PDF_DPI = int(os.getenv('OCR_PDF_DPI', '150'))
+# Worker processes that read PDF pages in parallel. Each loads its own copy of
+# the models, so leave at 0 (read in the request thread) unless memory allows.
+EASYOCR_WORKERS = int(os.getenv('EASYOCR_WORKERS', '0'))
+# Skip CLAHE contrast enhancement on every PDF page, not only on pages that are
+# already high-contrast. Leave off when scanned PDFs are uploaded.
+OCR_SKIP_CLAHE_FOR_PDF = os.getenv('OCR_SKIP_CLAHE_FOR_PDF', 'False').lower() in ('true', '1', 'yes')
+
+# Audit Log Configuration
+# Write audit rows from a background thread instead of on the request path.
+# Set AUDIT_LOG_ASYNC=False to insert synchronously (e.g. when running tests).
+AUDIT_LOG_ASYNC = os.getenv('AUDIT_LOG_ASYNC', 'True').lower() in ('true', '1', 'yes')
+# Flush audit batches through a server-side prepared statement (Postgres only).
+# Needs a direct or session-mode pooled connection; transaction-mode PgBouncer
+# (e.g. Neon's -pooler host) does not keep SQL-level PREPAREs between transactions.
+AUDIT_LOG_PREPARED_INSERT = os.getenv('AUDIT_LOG_PREPARED_INSERT', 'False').lower() in ('true', '1', 'yes')
+
+# Notifications
+# Write notifications addressed to every admin from a background thread.
+# Set NOTIFY_ADMINS_ASYNC=False to write them synchronously (e.g. when running tests).
+NOTIFY_ADMINS_ASYNC = os.getenv('NOTIFY_ADMINS_ASYNC', 'True').lower() in ('true', '1', 'yes')
 
 # Logging Configuration - console only for container deployments
 LOGGING = {
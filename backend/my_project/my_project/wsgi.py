@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'my_project.settings')
 
 application = get_wsgi_application()
+
+# Load the OCR models while the server starts instead of on the first OCR request
+from my_app.utils.ocr import warm_up_ocr_reader  # noqa: E402
+
+warm_up_ocr_reader()
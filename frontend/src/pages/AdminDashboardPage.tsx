@@ -123,7 +123,7 @@ const DashboardTab: React.FC = () => {
                   <tr key={a.id}>
                     <td>{a.action_display || a.action}</td>
                     <td>{a.actor_name || 'System'}</td>
-                    <td>{a.context && typeof a.context === 'object' && 'document_title' in a.context ? String(a.context.document_title) : '-'}</td>
+                    <td>{a.document_title || (a.context && typeof a.context === 'object' && 'document_title' in a.context ? String(a.context.document_title) : '-')}</td>
                     <td>{new Date(a.ts).toLocaleString()}</td>
                   </tr>
                 ))}
@@ -90,6 +90,8 @@ export interface AuditLogEntry {
   actor_user?: number;
   actor_name?: string;
   actor_email?: string;
+  document?: number | null;
+  document_title?: string | null;
   version_no?: number;
   context?: Record<string, unknown>;
   ip?: string;